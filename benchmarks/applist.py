@@ -0,0 +1,22 @@
+import random
+
+WORDS = [
+  'dark', 'souls', 'counter', 'strike', 'global', 'offensive', 'team', 'fortress', 'half', 'life', 'portal',
+  'civilization', 'age', 'empires', 'total', 'war', 'warhammer', 'star', 'wars', 'legends', 'simulator', 'farming',
+  'truck', 'euro', 'american', 'city', 'skylines', 'planet', 'zoo', 'coaster', 'space', 'engineers', 'kerbal',
+  'program', 'witcher', 'wild', 'hunt', 'elder', 'scrolls', 'skyrim', 'fallout', 'new', 'vegas', 'doom', 'eternal',
+  'quake', 'champions', 'rocket', 'league', 'football', 'manager', 'racing', 'rally', 'dirt', 'forza', 'horizon',
+  'stardew', 'valley', 'terraria', 'hollow', 'knight', 'celeste', 'dead', 'cells', 'hades', 'slay', 'spire',
+  'rogue', 'legacy', 'tactics', 'chronicles', 'remastered', 'deluxe', 'edition', 'soundtrack', 'dlc', 'pack',
+  'season', 'pass', 'demo', 'origins', 'rising', 'reborn', 'odyssey', 'saga', 'tales', 'mystery', 'escape', 'room',
+  'puzzle', 'quest', 'dungeon', 'dragon', 'fantasy', 'final', 'kingdom', 'hearts', 'monster', 'hunter', 'world'
+]
+SUFFIXES = ['', '', '', ' 2', ' 3', ' II', ' III', ': Remastered', ' - Soundtrack', ' - Season Pass', ' Demo', ' (2015)']
+
+def synthetic_app_list(count: int = 200000, seed: int = 42) -> list[dict]:
+  rng = random.Random(seed)
+  apps = []
+  for index in range(count):
+    name = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title() + rng.choice(SUFFIXES)
+    apps.append({'appid': 10 + index * 10, 'name': name})
+  return apps
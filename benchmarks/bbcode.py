@@ -0,0 +1,29 @@
+import argparse
+import pathlib
+import timeit
+from utils.formatting import SteamFormatter
+
+CORPUS_PATH = pathlib.Path(__file__).parent / 'corpus'
+
+def full_pass(content: str, max_length: int = 500) -> str:
+  engine = SteamFormatter.ENGINE
+  return engine._final_filter(engine._limit(engine._render_markup(content), max_chars=max_length, max_lines=12))
+
+def best_of(func, content: str, repeat: int, number: int) -> float:
+  return min(timeit.repeat(lambda: func(content), repeat=repeat, number=number)) / number
+
+def main(repeat: int, number: int) -> None:
+  print(f"{'corpus':<24} {'size':>8} {'full pass':>12} {'engine':>12} {'speedup':>8}")
+  for path in sorted(CORPUS_PATH.glob('*.bbcode')):
+    content = path.read_text(encoding='utf-8')
+    assert full_pass(content) == SteamFormatter.clean_content(content), f"{path.name} output differs"
+    before = best_of(full_pass, content, repeat, number)
+    after = best_of(SteamFormatter.clean_content, content, repeat, number)
+    print(f"{path.stem:<24} {len(content):>7}B {before * 1000:>10.3f}ms {after * 1000:>10.3f}ms {before / after:>7.1f}x")
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Compare the budgeted BBCode engine with a full-text pass of the same rules.')
+  parser.add_argument('--repeat', type=int, default=5)
+  parser.add_argument('--number', type=int, default=20)
+  args = parser.parse_args()
+  main(args.repeat, args.number)
@@ -0,0 +1,36 @@
+import difflib
+import pathlib
+import sys
+from utils.formatting import SteamFormatter
+
+CORPUS_PATH = pathlib.Path(__file__).parent / 'corpus'
+
+def golden_cases() -> list[tuple[pathlib.Path, pathlib.Path, int]]:
+  cases = []
+  for golden in sorted((CORPUS_PATH / 'golden').glob('*.txt')):
+    name, max_length = golden.stem.rsplit('.', 1)
+    cases.append((CORPUS_PATH / f"{name}.bbcode", golden, int(max_length)))
+  return cases
+
+def main() -> int:
+  failures = 0
+  for source, golden, max_length in golden_cases():
+    expected = golden.read_text(encoding='utf-8')
+    actual = SteamFormatter.clean_content(source.read_text(encoding='utf-8'), max_length=max_length)
+    if actual == expected:
+      print(f"ok    {golden.name}")
+      continue
+    failures += 1
+    print(f"FAIL  {golden.name}")
+    sys.stdout.writelines(difflib.unified_diff(
+      expected.splitlines(keepends=True),
+      actual.splitlines(keepends=True),
+      fromfile='golden',
+      tofile='clean_content'
+    ))
+    print()
+  print(f"{len(golden_cases()) - failures} / {len(golden_cases())} golden output(s) match")
+  return 1 if failures else 0
+
+if __name__ == '__main__':
+  sys.exit(main())
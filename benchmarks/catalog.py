@@ -0,0 +1,54 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.applist import synthetic_app_list
+from utils.catalog import AppCatalog
+from utils.matching import SearchIndex
+
+def rss_kb() -> int:
+  with open('/proc/self/status') as file:
+    for line in file:
+      if line.startswith('VmRSS:'):
+        return int(line.split()[1])
+  return 0
+
+def measure(mode: str, count: int, path: str) -> dict:
+  baseline = rss_kb()
+  started = time.perf_counter()
+  if mode == 'dicts':
+    apps = json.loads(json.dumps({'applist': {'apps': synthetic_app_list(count)}}))['applist']['apps']
+    index = SearchIndex.build(app['name'] for app in apps)
+    results = [apps[position] for position, _ in index.search('dark souls', limit=10)]
+  else:
+    catalog = AppCatalog.load(path)
+    results = [catalog.app(position) for position, _ in catalog.index.search('dark souls', limit=10)]
+  elapsed = time.perf_counter() - started
+  return {'mode': mode, 'rss_mb': (rss_kb() - baseline) / 1024, 'first_search_s': elapsed, 'results': len(results)}
+
+def main(count: int) -> None:
+  with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'steam_apps.bin')
+    AppCatalog.build(synthetic_app_list(count)).save(path)
+    print(f"{count} apps, catalog file {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+    for mode in ('dicts', 'mmap'):
+      output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.catalog', '--count', str(count), '--child', mode, '--path', path],
+        check=True, capture_output=True, text=True
+      ).stdout
+      result = json.loads(output)
+      print(f"{mode:<6} resident +{result['rss_mb']:>7.1f} MB  ready + first search {result['first_search_s'] * 1000:>8.1f} ms")
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Compare the in-memory app list with the memory-mapped catalog.')
+  parser.add_argument('--count', type=int, default=200000)
+  parser.add_argument('--child', choices=('dicts', 'mmap'))
+  parser.add_argument('--path')
+  args = parser.parse_args()
+  if args.child:
+    print(json.dumps(measure(args.child, args.count, args.path)))
+  else:
+    main(args.count)
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault('DB_PATH', 'sqlite+aiosqlite:///:memory:')
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from models import FollowedGame, Game, Server
+from utils.database import Database
+
+async def seed(db: Database, games: int, servers: int) -> None:
+  for i in range(servers):
+    await db.insert(Server(name=f"Server {i}", discord_id=str(100000 + i)))
+  for i in range(games):
+    await db.insert(Game(name=f"Game {i}", steam_id=str(i), image_url=f"https://example.com/{i}.jpg"))
+
+async def read_command(db: Database, rng: random.Random, games: int, servers: int) -> None:
+  server = (await db.execute(select(Server).filter_by(discord_id=str(100000 + rng.randrange(servers))))).scalars().first()
+  await db.execute(select(Game).filter_by(steam_id=str(rng.randrange(games))))
+  await db.execute(select(FollowedGame).filter_by(server_id=server.id))
+
+async def write_command(db: Database, rng: random.Random, games: int, servers: int) -> None:
+  await db.execute(
+    insert(FollowedGame)
+    .values(discord_channel_id=str(rng.randrange(1 << 40)), server_id=rng.randrange(servers) + 1, game_id=rng.randrange(games) + 1)
+    .on_conflict_do_nothing()
+  )
+
+async def client(db: Database, seed_value: int, commands: int, write_ratio: float, games: int, servers: int, latencies: list[float]) -> None:
+  rng = random.Random(seed_value)
+  for _ in range(commands):
+    command = write_command if rng.random() < write_ratio else read_command
+    started = time.perf_counter()
+    await command(db, rng, games, servers)
+    latencies.append(time.perf_counter() - started)
+
+async def run(profile: str, path: str, args: argparse.Namespace) -> dict:
+  db = Database(db_path=f"sqlite+aiosqlite:///{path}", profile=profile, read_pool_size=args.read_pool_size)
+  await db.setup()
+  await seed(db, args.games, args.servers)
+  latencies: list[float] = []
+  started = time.perf_counter()
+  await asyncio.gather(*(
+    client(db, i, args.commands, args.write_ratio, args.games, args.servers, latencies) for i in range(args.clients)
+  ))
+  elapsed = time.perf_counter() - started
+  await db.close()
+  latencies.sort()
+  return {
+    'throughput': len(latencies) / elapsed,
+    'p50': statistics.median(latencies),
+    'p95': latencies[int(len(latencies) * 0.95) - 1],
+    'p99': latencies[int(len(latencies) * 0.99) - 1]
+  }
+
+async def main(args: argparse.Namespace) -> None:
+  print(f"{args.clients} clients x {args.commands} commands, {args.write_ratio:.0%} writes")
+  for profile in ('default', 'production'):
+    with tempfile.TemporaryDirectory() as directory:
+      result = await run(profile, os.path.join(directory, 'bench.db'), args)
+    print(
+      f"{profile:<11} {result['throughput']:>8.0f} cmd/s  p50 {result['p50'] * 1000:>7.2f}ms  "
+      f"p95 {result['p95'] * 1000:>7.2f}ms  p99 {result['p99'] * 1000:>7.2f}ms"
+    )
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Compare SQLite engine profiles under mixed read/write command traffic.')
+  parser.add_argument('--clients', type=int, default=32)
+  parser.add_argument('--commands', type=int, default=50)
+  parser.add_argument('--write-ratio', type=float, default=0.2)
+  parser.add_argument('--games', type=int, default=500)
+  parser.add_argument('--servers', type=int, default=100)
+  parser.add_argument('--read-pool-size', type=int, default=4)
+  asyncio.run(main(parser.parse_args()))
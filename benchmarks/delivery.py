@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+import discord
+from bot.services.delivery import DEFAULT_PRIORITY, PREMIUM_PRIORITY, Delivery, DeliveryScheduler, percentile
+
+class StubChannel:
+  def __init__(self, channel_id: int, rtt: float, missing: bool) -> None:
+    self.id = channel_id
+    self.rtt = rtt
+    self.missing = missing
+
+  async def send(self, embed: discord.Embed) -> None:
+    await asyncio.sleep(self.rtt)
+    if self.missing:
+      raise discord.NotFound(SimpleNamespace(status=404, reason='Not Found'), 'Unknown Channel')
+
+class StubBot:
+  def __init__(self, channels: dict[int, StubChannel]) -> None:
+    self.channels = channels
+
+  def get_channel(self, channel_id: int) -> StubChannel:
+    return self.channels[channel_id]
+
+  def get_partial_messageable(self, channel_id: int) -> StubChannel:
+    return self.channels[channel_id]
+
+async def serial(bot: StubBot, deliveries: list[Delivery]) -> list[float]:
+  started = time.monotonic()
+  latencies = []
+  for delivery in deliveries:
+    try:
+      await bot.get_channel(delivery.channel_id).send(embed=delivery.embed)
+    except discord.HTTPException:
+      break
+    latencies.append(time.monotonic() - started)
+  return latencies
+
+async def scheduled(bot: StubBot, deliveries: list[Delivery], global_rate: float) -> list[float]:
+  scheduler = DeliveryScheduler(bot, global_rate=global_rate)
+  await scheduler.deliver(deliveries)
+  await scheduler.close()
+  return list(scheduler.latencies)
+
+async def main(args: argparse.Namespace) -> None:
+  rng = random.Random(42)
+  channels = {i: StubChannel(i, args.rtt, rng.random() < args.missing) for i in range(args.channels)}
+  deliveries = [
+    Delivery(channel_id=i, embed=discord.Embed(title='News'), priority=PREMIUM_PRIORITY if rng.random() < 0.1 else DEFAULT_PRIORITY)
+    for i in range(args.channels)
+  ]
+  bot = StubBot(channels)
+  print(f"{args.channels} channels, {args.rtt * 1000:.0f}ms round trip, {args.global_rate:.0f} req/s global budget")
+  for name, run in (('serial', lambda: serial(bot, deliveries)), ('scheduler', lambda: scheduled(bot, deliveries, args.global_rate))):
+    started = time.perf_counter()
+    latencies = await run()
+    elapsed = time.perf_counter() - started
+    print(
+      f"{name:<10} {elapsed:>7.2f}s  {len(latencies):>5} attempted  "
+      f"p50 {percentile(latencies, 0.5):>6.2f}s  p95 {percentile(latencies, 0.95):>6.2f}s  p99 {percentile(latencies, 0.99):>6.2f}s"
+    )
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Compare serial news delivery with the rate-limited delivery scheduler.')
+  parser.add_argument('--channels', type=int, default=300)
+  parser.add_argument('--rtt', type=float, default=0.08)
+  parser.add_argument('--missing', type=float, default=0.0)
+  parser.add_argument('--global-rate', type=float, default=50.0)
+  asyncio.run(main(parser.parse_args()))
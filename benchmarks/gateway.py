@@ -0,0 +1,135 @@
+import argparse
+import asyncio
+import gc
+import json
+import os
+import subprocess
+import sys
+
+os.environ.setdefault('DB_PATH', 'sqlite+aiosqlite:///:memory:')
+
+BOT_USER = {'id': '1181244156757155971', 'username': 'NoxBot', 'discriminator': '0', 'avatar': None, 'bot': True}
+
+def rss_kb() -> int:
+  with open('/proc/self/status') as file:
+    for line in file:
+      if line.startswith('VmRSS:'):
+        return int(line.split()[1])
+  return 0
+
+def member_payload(user_id: int, joined_at: str) -> dict:
+  return {
+    'user': {'id': str(user_id), 'username': f"user{user_id}", 'discriminator': '0', 'avatar': None, 'global_name': f"User {user_id}"},
+    'roles': [],
+    'joined_at': joined_at,
+    'deaf': False,
+    'mute': False,
+    'flags': 0
+  }
+
+def guild_payload(guild_id: int, members: int, channels: int, full_members: bool) -> dict:
+  joined_at = '2024-01-01T00:00:00+00:00'
+  member_ids = range(guild_id * 10000, guild_id * 10000 + members)
+  payload = {
+    'id': str(guild_id),
+    'name': f"Guild {guild_id}",
+    'owner_id': str(guild_id * 10000),
+    'member_count': members,
+    'large': False,
+    'features': [],
+    'emojis': [],
+    'stickers': [],
+    'roles': [{'id': str(guild_id), 'name': '@everyone', 'permissions': '0', 'position': 0, 'color': 0, 'hoist': False, 'managed': False, 'mentionable': False}],
+    'channels': [
+      {'id': str(guild_id * 1000 + i), 'type': 0, 'name': f"channel-{i}", 'position': i, 'permission_overwrites': []}
+      for i in range(channels)
+    ],
+    'members': [member_payload(int(BOT_USER['id']), joined_at) | {'user': BOT_USER}],
+    'presences': [],
+    'voice_states': [],
+    'threads': [],
+    'stage_instances': [],
+    'guild_scheduled_events': []
+  }
+  if full_members:
+    payload['members'] += [member_payload(user_id, joined_at) for user_id in member_ids]
+    payload['presences'] = [
+      {'user': {'id': str(user_id)}, 'status': 'online', 'activities': [{'name': 'Steam', 'type': 0}], 'client_status': {'desktop': 'online'}}
+      for user_id in member_ids
+    ]
+  return payload
+
+def message_payload(guild_id: int, message_id: int) -> dict:
+  author = guild_id * 10000 + message_id % 50
+  return {
+    'id': str(guild_id * 100000 + message_id),
+    'channel_id': str(guild_id * 1000),
+    'guild_id': str(guild_id),
+    'author': {'id': str(author), 'username': f"user{author}", 'discriminator': '0', 'avatar': None},
+    'member': {'roles': [], 'joined_at': '2024-01-01T00:00:00+00:00', 'deaf': False, 'mute': False, 'flags': 0},
+    'content': 'Une nouvelle mise à jour est disponible !',
+    'timestamp': '2024-01-01T00:00:00+00:00',
+    'edited_timestamp': None,
+    'tts': False,
+    'mention_everyone': False,
+    'mentions': [],
+    'mention_roles': [],
+    'attachments': [],
+    'embeds': [],
+    'pinned': False,
+    'type': 0
+  }
+
+async def measure(profile: str, guilds: int, members: int, channels: int, messages: int) -> dict:
+  os.environ['GATEWAY_PROFILE'] = profile
+  import discord
+  from utils.discord import bot
+
+  await bot._async_setup_hook()
+  state = bot._connection
+  state.user = discord.ClientUser(state=state, data=BOT_USER)
+  full_members = state.member_cache_flags.joined
+  receives_messages = state._intents.guild_messages
+  gc.collect()
+  baseline = rss_kb()
+  for guild_id in range(1, guilds + 1):
+    state.parse_guild_create(guild_payload(guild_id, members, channels, full_members))
+    if receives_messages:
+      for message_id in range(messages):
+        state.parse_message_create(message_payload(guild_id, message_id))
+  await asyncio.sleep(0)
+  gc.collect()
+  return {
+    'profile': profile,
+    'guilds': len(bot.guilds),
+    'members': sum(len(guild.members) for guild in bot.guilds),
+    'messages': len(state._messages or []),
+    'rss_mb': (rss_kb() - baseline) / 1024
+  }
+
+def main(args: argparse.Namespace) -> None:
+  print(f"{args.guilds} guilds, {args.members} members and {args.channels} channels per guild")
+  for profile in ('default', 'lean'):
+    output = subprocess.run(
+      [sys.executable, '-m', 'benchmarks.gateway', '--child', profile, '--guilds', str(args.guilds),
+       '--members', str(args.members), '--channels', str(args.channels), '--messages', str(args.messages)],
+      check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    print(
+      f"{profile:<8} {result['members']:>8} cached member(s)  {result['messages']:>5} cached message(s)  "
+      f"+{result['rss_mb']:>7.1f} MB  {result['rss_mb'] * 1000 / args.guilds:>7.1f} MB per 1000 guilds"
+    )
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Compare gateway cache memory between the default and lean profiles.')
+  parser.add_argument('--guilds', type=int, default=1000)
+  parser.add_argument('--members', type=int, default=200)
+  parser.add_argument('--channels', type=int, default=20)
+  parser.add_argument('--messages', type=int, default=5)
+  parser.add_argument('--child', choices=('default', 'lean'))
+  args = parser.parse_args()
+  if args.child:
+    print(json.dumps(asyncio.run(measure(args.child, args.guilds, args.members, args.channels, args.messages))))
+  else:
+    main(args)
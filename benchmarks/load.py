@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Optional
+from benchmarks.stubs import PUBLISHED_BASE, FakeDiscord, SteamStub
+from bot.services.polling import PollScheduler
+
+class EveryGameScheduler(PollScheduler):
+  def due(self, now: Optional[float] = None) -> list[str]:
+    self.polls += len(self.targets)
+    return list(self.targets)
+
+class HarnessBot(FakeDiscord):
+  def __init__(self, database: Any, steam: Any, latency: float, global_rate: int) -> None:
+    super().__init__(latency=latency, global_rate=global_rate)
+    self.database = database
+    self.steam = steam
+
+  def owns_guild(self, guild_id: int) -> bool:
+    return True
+
+  async def wait_until_ready(self) -> None:
+    await asyncio.Event().wait()
+
+def configure_environment(args: argparse.Namespace, data_path: str) -> None:
+  os.environ.update({
+    'DB_PATH': f"sqlite+aiosqlite:///{os.path.join(data_path, 'load.db')}",
+    'DB_PROFILE': 'production',
+    'DB_PROFILING': 'on',
+    'DB_SLOW_QUERY_MS': str(args.slow_query_ms),
+    'DATA_PATH': data_path,
+    'STEAM_API_URL': f"http://127.0.0.1:{args.port}",
+    'STEAM_STORE_URL': f"http://127.0.0.1:{args.port}",
+    'DELIVERY_GLOBAL_RATE': str(args.global_rate),
+    'WORKER_ID': 'load-harness',
+    'METRICS_PORT': '0'
+  })
+  os.environ.pop('LOG_FILE', None)
+
+async def seed(database, games: int, followers: int, games_per_server: int) -> None:
+  from sqlalchemy import insert
+  from models import FollowedGame, Game, News, Server
+
+  servers = -(-games * followers // games_per_server)
+  async with database.engine.begin() as conn:
+    await conn.execute(insert(Game), [
+      {'id': i + 1, 'name': f"App {10 + i * 10}", 'steam_id': str(10 + i * 10), 'image_url': ''}
+      for i in range(games)
+    ])
+    await conn.execute(insert(News), [
+      {
+        'title': 'Update 1', 'description': '', 'steam_id': f"{10 + i * 10}-1", 'url': '',
+        'published_date': datetime.fromtimestamp(PUBLISHED_BASE + 3600), 'image_url': None, 'game_id': i + 1
+      }
+      for i in range(games)
+    ])
+    await conn.execute(insert(Server), [
+      {'id': i + 1, 'name': f"Server {i}", 'discord_id': str(1000000 + i), 'premium_status': i % 10 == 0}
+      for i in range(servers)
+    ])
+    await conn.execute(insert(FollowedGame), [
+      {
+        'discord_channel_id': str(2000000 + (follower * games + game) // games_per_server),
+        'server_id': (follower * games + game) // games_per_server + 1,
+        'game_id': game + 1,
+        'last_news_steam_id': f"{10 + game * 10}-1"
+      }
+      for follower in range(followers)
+      for game in range(games)
+    ])
+  print(f"Seeded {games} game(s), {servers} server(s), {games * followers} followed game(s)")
+
+async def main(args: argparse.Namespace) -> None:
+  from bot.cogs.news.tasks import NEWS_ARTICLES, NewsTask
+  from utils.database import database
+  from utils.imaging import image_prober
+  from utils.steamer import steam
+
+  stub = SteamStub(
+    latency=args.steam_latency_ms / 1000,
+    error_rate=args.error_rate,
+    churn=args.churn,
+    rng=random.Random(args.seed)
+  )
+  await stub.start(port=args.port)
+  await database.setup()
+  await seed(database, args.games, args.followers, min(args.games_per_server, args.games))
+  database.profiler.reset()
+  await steam.start()
+
+  bot = HarnessBot(database, steam, latency=args.send_latency_ms / 1000, global_rate=args.global_rate)
+  task = NewsTask(bot)
+  task.check_for_news.cancel()
+  task.poller = EveryGameScheduler()
+
+  print(f"{'cycle':>5} {'games':>7} {'new':>6} {'time':>8} {'steam':>7} {'304':>6} {'errors':>6} {'db stmts':>9} {'sent':>6} {'sent/s':>7} {'429':>5}")
+  totals = {'time': 0.0, 'steam': 0, 'statements': 0, 'sent': 0}
+  for cycle in range(1, args.cycles + 1):
+    steam_calls = sum(count for (endpoint, _), count in stub.calls.items() if endpoint == 'news')
+    not_modified = stub.calls['news', 304]
+    errors = sum(count for (endpoint, status), count in stub.calls.items() if endpoint == 'news' and status >= 400)
+    statements = sum(stats.calls for stats in database.profiler.stats.values())
+    sends, rate_limited, articles = bot.sends, bot.rate_limited, NEWS_ARTICLES.total()
+
+    started = time.perf_counter()
+    await task.check_for_news()
+    elapsed = time.perf_counter() - started
+
+    cycle_steam = sum(count for (endpoint, _), count in stub.calls.items() if endpoint == 'news') - steam_calls
+    cycle_errors = sum(count for (endpoint, status), count in stub.calls.items() if endpoint == 'news' and status >= 400) - errors
+    cycle_statements = sum(stats.calls for stats in database.profiler.stats.values()) - statements
+    cycle_sent = bot.sends - sends
+    print(
+      f"{cycle:>5} {len(task.poller.targets):>7} {int(NEWS_ARTICLES.total() - articles):>6} {elapsed:>7.2f}s "
+      f"{cycle_steam:>7} {stub.calls['news', 304] - not_modified:>6} {cycle_errors:>6} {cycle_statements:>9} "
+      f"{cycle_sent:>6} {cycle_sent / elapsed:>7.1f} {bot.rate_limited - rate_limited:>5}"
+    )
+    totals['time'] += elapsed
+    totals['steam'] += cycle_steam
+    totals['statements'] += cycle_statements
+    totals['sent'] += cycle_sent
+
+  print(
+    f"Total : {totals['time']:.2f}s over {args.cycles} cycle(s), {totals['steam'] / totals['time']:.0f} Steam call(s)/s, "
+    f"{totals['statements'] / totals['time']:.0f} DB statement(s)/s, {totals['sent'] / totals['time']:.1f} delivery(ies)/s"
+  )
+  print("Costliest statements :")
+  for stats in database.profiler.report(limit=args.top):
+    print(f"  {stats['total_ms']:>9.0f}ms {stats['calls']:>7} call(s) {stats['max_rows']:>7} row(s) max  {stats['shape'][:100]}")
+
+  await task.cog_unload()
+  await steam.close()
+  await image_prober.close()
+  await database.close()
+  await stub.close()
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Run full news polling cycles against a local Steam stub, fake Discord channels and a temporary SQLite database.')
+  parser.add_argument('--games', type=int, default=1000)
+  parser.add_argument('--followers', type=int, default=3, help='servers following each game')
+  parser.add_argument('--games-per-server', type=int, default=10)
+  parser.add_argument('--cycles', type=int, default=3)
+  parser.add_argument('--churn', type=float, default=0.05, help='probability that a poll finds a new announcement')
+  parser.add_argument('--error-rate', type=float, default=0.01, help='share of Steam requests answered with 429/500/503')
+  parser.add_argument('--steam-latency-ms', type=float, default=50)
+  parser.add_argument('--send-latency-ms', type=float, default=50)
+  parser.add_argument('--global-rate', type=int, default=50, help='Discord global requests per second')
+  parser.add_argument('--slow-query-ms', type=int, default=1000)
+  parser.add_argument('--top', type=int, default=5, help='number of costly statements to list')
+  parser.add_argument('--port', type=int, default=8799, help='port of the local Steam stub')
+  parser.add_argument('--seed', type=int, default=42)
+  parser.add_argument('--keep', action='store_true', help='keep the temporary data directory')
+  args = parser.parse_args()
+
+  data_path = tempfile.mkdtemp(prefix='noxbot-load-')
+  configure_environment(args, data_path)
+  try:
+    asyncio.run(main(args))
+  finally:
+    if args.keep:
+      print(f"Data kept in {data_path}")
+    else:
+      shutil.rmtree(data_path, ignore_errors=True)
@@ -0,0 +1,39 @@
+import argparse
+import time
+from benchmarks.applist import synthetic_app_list
+from utils.matching import Matcher, SearchIndex
+
+QUERIES = ['counter strike', 'dark souls', 'witcher', 'zoo', 'dlc', 'hollow knight silksong', 'farming simulator 2', 'fn']
+
+def main(count: int, repeat: int) -> None:
+  apps = synthetic_app_list(count)
+  started = time.perf_counter()
+  index = SearchIndex.build(app['name'] for app in apps)
+  print(f"{count} apps, index built in {time.perf_counter() - started:.2f}s")
+  print(f"{'query':<26} {'linear scan':>12} {'index':>10} {'top-10':>10} {'hits':>7}")
+  for query in QUERIES:
+    started = time.perf_counter()
+    expected = Matcher.search_and_sort_by_string(query, apps)
+    linear = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+      matches = index.search(query)
+    indexed = (time.perf_counter() - started) / repeat
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+      index.search(query, limit=10)
+    top = (time.perf_counter() - started) / repeat
+
+    fuzzy = ' (fuzzy)' if matches and not expected else ''
+    print(f"{query:<26} {linear * 1000:>10.1f}ms {indexed * 1000:>8.2f}ms {top * 1000:>8.2f}ms {len(matches):>7}{fuzzy}")
+    if expected and len(expected) != len({apps[position]['name'] for position, _ in matches}):
+      print(f"  warning: {len(expected)} result(s) from the linear scan")
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Compare the linear Matcher scan with the trigram SearchIndex.')
+  parser.add_argument('--count', type=int, default=200000)
+  parser.add_argument('--repeat', type=int, default=20)
+  args = parser.parse_args()
+  main(args.count, args.repeat)
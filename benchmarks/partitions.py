@@ -0,0 +1,92 @@
+import argparse
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+def child(worker_id: str, path: str, partitions: int, ttl: float) -> None:
+  os.environ['DB_PATH'] = f"sqlite+aiosqlite:///{path}"
+  from bot.services.leases import PartitionLeases
+  from utils.database import database
+
+  async def run() -> None:
+    await database.setup()
+    leases = PartitionLeases(database, worker_id, partitions=partitions, ttl=ttl)
+    while True:
+      await leases.renew()
+      await asyncio.sleep(ttl / 3)
+
+  asyncio.run(run())
+
+def create_schema(path: str) -> None:
+  os.environ.setdefault('DB_PATH', f"sqlite+aiosqlite:///{path}")
+  import models
+  from utils.database import Database
+
+  async def run() -> None:
+    db = Database(db_path=f"sqlite+aiosqlite:///{path}", profile='production')
+    await db.setup()
+    await db.close()
+
+  asyncio.run(run())
+
+def ownership(path: str) -> dict[str, list[int]]:
+  with sqlite3.connect(path) as conn:
+    rows = conn.execute('SELECT worker_id, partition FROM partition_leases WHERE expires_at > ?', (time.time(),)).fetchall()
+  owners: dict[str, list[int]] = {}
+  for worker_id, partition in rows:
+    owners.setdefault(worker_id, []).append(partition)
+  return owners
+
+def main(args: argparse.Namespace) -> None:
+  with tempfile.TemporaryDirectory() as directory:
+    path = os.path.join(directory, 'leases.db')
+    command = [sys.executable, '-m', 'benchmarks.partitions', '--db', path, '--partitions', str(args.partitions), '--ttl', str(args.ttl)]
+    env = dict(os.environ, DB_PROFILE='production')
+    create_schema(path)
+    processes = {}
+    for worker in range(args.workers):
+      worker_id = f"worker-{worker}"
+      with open(os.path.join(directory, f"{worker_id}.log"), 'wb') as log_file:
+        processes[worker_id] = subprocess.Popen(command + ['--child', worker_id], env=env, stderr=log_file, stdout=subprocess.DEVNULL)
+      time.sleep(0.2)
+    started = time.monotonic()
+    killed = None
+    try:
+      while time.monotonic() - started < args.duration:
+        time.sleep(args.ttl / 2)
+        elapsed = time.monotonic() - started
+        if killed is None and elapsed >= args.duration / 3:
+          killed = 'worker-0'
+          processes[killed].kill()
+          print(f"{elapsed:5.1f}s  killed {killed}")
+        for worker_id, process in processes.items():
+          if worker_id != killed and process.poll() is not None:
+            with open(os.path.join(directory, f"{worker_id}.log"), encoding='utf-8', errors='replace') as log_file:
+              raise RuntimeError(f"{worker_id} exited with code {process.returncode}:\n{log_file.read()[-2000:]}")
+        owners = ownership(path)
+        covered = sorted(partition for partitions in owners.values() for partition in partitions)
+        print(
+          f"{elapsed:5.1f}s  " + '  '.join(f"{worker_id}={len(owners.get(worker_id, []))}" for worker_id in sorted(processes))
+          + f"  covered {len(set(covered))}/{args.partitions}" + ('  OVERLAP' if len(covered) != len(set(covered)) else '')
+        )
+    finally:
+      for process in processes.values():
+        process.kill()
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Run several lease holders on one SQLite file and show partition rebalancing when one dies.')
+  parser.add_argument('--workers', type=int, default=3)
+  parser.add_argument('--partitions', type=int, default=64)
+  parser.add_argument('--ttl', type=float, default=3.0)
+  parser.add_argument('--duration', type=float, default=15.0)
+  parser.add_argument('--child')
+  parser.add_argument('--db')
+  args = parser.parse_args()
+  if args.child:
+    child(args.child, args.db, args.partitions, args.ttl)
+  else:
+    main(args)
@@ -0,0 +1,85 @@
+import argparse
+import bisect
+import random
+import statistics
+from datetime import datetime
+from bot.services.polling import PollScheduler
+
+DAY = 86400
+
+def synthetic_games(count: int, rng: random.Random) -> list[dict]:
+  games = []
+  for i in range(count):
+    profile = rng.random()
+    if profile < 0.1:
+      gap = rng.uniform(0.5, 2) * DAY
+    elif profile < 0.4:
+      gap = rng.uniform(5, 20) * DAY
+    else:
+      gap = rng.uniform(200, 800) * DAY
+    followers = max(1, int(rng.paretovariate(1.2)))
+    games.append({'steam_id': str(i), 'gap': gap, 'followers': followers, 'active': profile < 0.1})
+  return games
+
+def publications(game: dict, start: float, end: float, rng: random.Random) -> list[float]:
+  times = []
+  t = start - rng.uniform(0, game['gap'])
+  while t < end:
+    times.append(t)
+    t += rng.expovariate(1 / game['gap'])
+  return times
+
+def simulate(games: list[dict], posts: dict[str, list[float]], start: float, days: int, adaptive: bool, args: argparse.Namespace) -> dict:
+  end = start + days * DAY
+  latencies = {True: [], False: []}
+  seen = {game['steam_id']: bisect.bisect_right(posts[game['steam_id']], start) for game in games}
+  calls = 0
+  scheduler = PollScheduler(budget_per_minute=args.budget, rng=random.Random(7))
+  targets = []
+  for game in games:
+    last_seen = seen[game['steam_id']]
+    published = datetime.fromtimestamp(posts[game['steam_id']][last_seen - 1]) if last_seen else None
+    targets.append((game['steam_id'], game['followers'], published))
+  scheduler.sync(targets, now=start)
+  by_id = {game['steam_id']: game for game in games}
+  now = start
+  while now < end:
+    now += args.tick if adaptive else 1800
+    due = scheduler.due(now) if adaptive else list(by_id)
+    calls += len(due)
+    for steam_id in due:
+      timeline = posts[steam_id]
+      latest = bisect.bisect_right(timeline, now)
+      if latest > seen[steam_id]:
+        for published in timeline[seen[steam_id]:latest]:
+          latencies[by_id[steam_id]['active']].append(now - published)
+        seen[steam_id] = latest
+        scheduler.observe(steam_id, datetime.fromtimestamp(timeline[latest - 1]))
+    if adaptive:
+      scheduler.reschedule(due, now)
+  return {
+    'calls': calls,
+    'active_median': statistics.median(latencies[True]) if latencies[True] else 0.0,
+    'all_median': statistics.median(latencies[True] + latencies[False]) if latencies[True] or latencies[False] else 0.0
+  }
+
+def main(args: argparse.Namespace) -> None:
+  rng = random.Random(42)
+  start = 1_700_000_000.0
+  games = synthetic_games(args.games, rng)
+  posts = {game['steam_id']: publications(game, start, start + args.days * DAY, rng) for game in games}
+  print(f"{args.games} games over {args.days} day(s), poll budget {args.budget}/min")
+  for name, adaptive in (('fixed 30 min', False), ('adaptive', True)):
+    result = simulate(games, posts, start, args.days, adaptive, args)
+    print(
+      f"{name:<13} {result['calls']:>8} Steam call(s)  median latency active games {result['active_median'] / 60:>6.1f} min"
+      f"  all games {result['all_median'] / 60:>6.1f} min"
+    )
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Simulate fixed-interval polling against the adaptive poll scheduler.')
+  parser.add_argument('--games', type=int, default=2000)
+  parser.add_argument('--days', type=int, default=14)
+  parser.add_argument('--budget', type=float, default=60.0)
+  parser.add_argument('--tick', type=float, default=30.0)
+  main(parser.parse_args())
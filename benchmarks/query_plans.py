@@ -0,0 +1,56 @@
+import argparse
+import asyncio
+import os
+import sys
+
+os.environ.setdefault('DB_PATH', 'sqlite+aiosqlite:///:memory:')
+
+from sqlalchemy import text
+from sqlalchemy.dialects import sqlite
+from models import queries
+from utils.database import Database
+
+QUERIES = {
+  'server_by_discord_id': (queries.server_by_discord_id('1'), set()),
+  'servers_by_discord_ids': (queries.servers_by_discord_ids(['1', '2']), set()),
+  'game_by_steam_id': (queries.game_by_steam_id('1'), set()),
+  'games_followed_by_servers': (queries.games_followed_by_servers([1, 2]), set()),
+  'followed_game': (queries.followed_game(1, 1), set()),
+  'followed_game_with_news': (queries.followed_game_with_news(1, 1), set()),
+  'followed_games_for_server': (queries.followed_games_for_server(1), set()),
+  'followed_game_names_for_guild': (queries.followed_game_names_for_guild('1'), set()),
+  'followed_games_for_steam_ids': (queries.followed_games_for_steam_ids(['1', '2']), set()),
+  'poll_targets': (queries.poll_targets(), {'games'}),
+  'pending_deliveries': (queries.pending_deliveries(), {'followed_games'}),
+  'all_followed_games': (queries.all_followed_games(), {'followed_games'})
+}
+
+def full_scans(plan: list[str]) -> set[str]:
+  tables = set()
+  for detail in plan:
+    words = detail.split()
+    if words[0] == 'SCAN' and 'USING' not in words:
+      tables.add(words[1])
+  return tables
+
+async def main(verbose: bool) -> int:
+  db = Database()
+  await db.setup()
+  failures = 0
+  async with db.engine.connect() as conn:
+    for name, (statement, allowed_scans) in QUERIES.items():
+      sql = str(statement.compile(dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True}))
+      plan = [row[-1] for row in await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+      unexpected = full_scans(plan) - allowed_scans
+      failures += bool(unexpected)
+      print(f"{'FAIL' if unexpected else 'ok':<5} {name}" + (f" : full scan of {', '.join(sorted(unexpected))}" if unexpected else ''))
+      if verbose or unexpected:
+        for detail in plan:
+          print(f"        {detail}")
+  await db.close()
+  return failures
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Check that the bot queries are backed by indexes.')
+  parser.add_argument('--verbose', action='store_true')
+  sys.exit(1 if asyncio.run(main(parser.parse_args().verbose)) else 0)
@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, Optional
+import aiohttp
+from aiohttp import web
+from utils.steamer import Steam
+
+NEWS_PAYLOAD = {
+  'appnews': {
+    'appid': 440,
+    'newsitems': [
+      {
+        'gid': '5123456789012345678',
+        'title': 'Team Fortress 2 Update Released',
+        'url': 'https://steamstore-a.akamaihd.net/news/externalpost/steam_community_announcements/5123456789012345678',
+        'contents': '[h1]Patch notes[/h1][list][*]Fixed a crash[*]Updated localization files[/list]' * 20,
+        'feedname': 'steam_community_announcements',
+        'date': 1700000000
+      }
+    ]
+  }
+}
+
+async def start_stub_server(latency: float) -> tuple[web.AppRunner, str]:
+  async def news(request: web.Request) -> web.Response:
+    if latency:
+      await asyncio.sleep(latency)
+    return web.json_response(NEWS_PAYLOAD)
+
+  app = web.Application()
+  app.router.add_get('/ISteamNews/GetNewsForApp/v0002/', news)
+  runner = web.AppRunner(app, access_log=None)
+  await runner.setup()
+  site = web.TCPSite(runner, '127.0.0.1', 0)
+  await site.start()
+  port = site._server.sockets[0].getsockname()[1]
+  return runner, f"http://127.0.0.1:{port}/ISteamNews/GetNewsForApp/v0002/"
+
+async def fetch_with_new_session(url: str, params: Optional[dict] = None) -> Optional[dict]:
+  try:
+    async with aiohttp.ClientSession() as session:
+      async with session.get(url, params=params) as response:
+        if response.status == 200:
+          return await response.json()
+  except aiohttp.ClientError:
+    return None
+  return None
+
+async def measure(fetch: Callable[[int], Awaitable[Optional[dict]]], requests: int, concurrency: int) -> dict:
+  semaphore = asyncio.Semaphore(concurrency)
+  latencies: list[float] = []
+  failures = 0
+
+  async def one(app_id: int) -> None:
+    nonlocal failures
+    async with semaphore:
+      started = time.perf_counter()
+      data = await fetch(app_id)
+      latencies.append(time.perf_counter() - started)
+      if not data:
+        failures += 1
+
+  started = time.perf_counter()
+  await asyncio.gather(*(one(app_id) for app_id in range(requests)))
+  elapsed = time.perf_counter() - started
+  latencies.sort()
+  return {
+    'elapsed': elapsed,
+    'rps': requests / elapsed,
+    'mean_ms': statistics.mean(latencies) * 1000,
+    'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    'failures': failures
+  }
+
+def report(label: str, result: dict) -> None:
+  print(
+    f"{label:<16} {result['elapsed']:>8.2f}s {result['rps']:>9.1f} req/s "
+    f"mean {result['mean_ms']:>7.2f} ms  p95 {result['p95_ms']:>7.2f} ms  failures {result['failures']}"
+  )
+
+async def main(requests: int, concurrency: int, latency: float) -> None:
+  runner, url = await start_stub_server(latency)
+  steam = Steam()
+  try:
+    before = await measure(lambda app_id: fetch_with_new_session(url, {'appid': app_id, 'format': 'json'}), requests, concurrency)
+    await steam.start()
+    after = await measure(lambda app_id: steam._fetch_json(url, {'appid': app_id, 'format': 'json'}), requests, concurrency)
+  finally:
+    await steam.close()
+    await runner.cleanup()
+
+  print(f"{requests} requests, concurrency {concurrency}, stub latency {latency * 1000:.0f} ms")
+  report('session/request', before)
+  report('pooled session', after)
+  print(f"speedup x{before['elapsed'] / after['elapsed']:.2f}")
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Compare per-request sessions with the pooled Steam session against a local stub.')
+  parser.add_argument('--requests', type=int, default=2000)
+  parser.add_argument('--concurrency', type=int, default=20)
+  parser.add_argument('--latency', type=float, default=0.0, help='Artificial stub latency in seconds')
+  args = parser.parse_args()
+  asyncio.run(main(args.requests, args.concurrency, args.latency))
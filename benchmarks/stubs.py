@@ -0,0 +1,176 @@
+import asyncio
+import json
+import pathlib
+import random
+import re
+import struct
+import time
+import zlib
+from collections import Counter, deque
+from typing import Optional
+from aiohttp import web
+from benchmarks.applist import synthetic_app_list
+
+CORPUS_PATH = pathlib.Path(__file__).parent / 'corpus'
+PUBLISHED_BASE = 1700000000
+
+def png_header(width: int, height: int) -> bytes:
+  ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+  return b'\x89PNG\r\n\x1a\n' + struct.pack('>I', len(ihdr)) + b'IHDR' + ihdr + struct.pack('>I', zlib.crc32(b'IHDR' + ihdr))
+
+class SteamStub:
+  def __init__(
+    self,
+    latency: float = 0.05,
+    jitter: float = 0.5,
+    error_rate: float = 0.0,
+    churn: float = 0.05,
+    app_count: int = 200000,
+    rng: Optional[random.Random] = None
+  ) -> None:
+    self.latency: float = latency
+    self.jitter: float = jitter
+    self.error_rate: float = error_rate
+    self.churn: float = churn
+    self.app_count: int = app_count
+    self.rng: random.Random = rng or random.Random(42)
+    self.calls: Counter = Counter()
+    self.announcements: dict[str, int] = {}
+    self.contents: list[str] = [
+      re.sub(r'\[img\].*?\[/img\]', '', path.read_text(encoding='utf-8'), flags=re.DOTALL)
+      for path in sorted(CORPUS_PATH.glob('*.bbcode'))
+    ]
+    self.url: Optional[str] = None
+    self._runner: Optional[web.AppRunner] = None
+    self._app_list: Optional[bytes] = None
+
+  async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+    app = web.Application()
+    app.router.add_get('/ISteamNews/GetNewsForApp/v0002/', self._news)
+    app.router.add_get('/api/appdetails', self._app_details)
+    app.router.add_get('/ISteamApps/GetAppList/v2/', self._app_list_handler)
+    app.router.add_get('/images/{name}', self._image)
+    self._runner = web.AppRunner(app, access_log=None)
+    await self._runner.setup()
+    await web.TCPSite(self._runner, host, port).start()
+    self.url = f"http://{host}:{self._runner.addresses[0][1]}"
+    return self.url
+
+  async def close(self) -> None:
+    if self._runner:
+      await self._runner.cleanup()
+      self._runner = None
+
+  def announcement(self, app_id: str) -> dict:
+    gid = self.announcements.setdefault(app_id, 1)
+    return {
+      'gid': f"{app_id}-{gid}",
+      'title': f"Update {gid} for app {app_id}",
+      'url': f"{self.url}/news/{app_id}/{gid}",
+      'contents': f"[img]{self.url}/images/{app_id}.png[/img]\n" + self.contents[(int(app_id) + gid) % len(self.contents)],
+      'feedname': 'steam_community_announcements',
+      'date': PUBLISHED_BASE + gid * 3600
+    }
+
+  async def _simulate(self, endpoint: str) -> Optional[web.Response]:
+    await asyncio.sleep(self.latency * self.rng.uniform(1 - self.jitter, 1 + self.jitter))
+    if self.rng.random() < self.error_rate:
+      status = self.rng.choice((429, 500, 503))
+      self.calls[endpoint, status] += 1
+      return web.Response(status=status)
+    return None
+
+  async def _news(self, request: web.Request) -> web.StreamResponse:
+    error = await self._simulate('news')
+    if error is not None:
+      return error
+    app_id = request.query.get('appid', '0')
+    if app_id in self.announcements and self.rng.random() < self.churn:
+      self.announcements[app_id] += 1
+    item = self.announcement(app_id)
+    etag = f'"{item["gid"]}"'
+    if request.headers.get('If-None-Match') == etag:
+      self.calls['news', 304] += 1
+      return web.Response(status=304, headers={'ETag': etag})
+    self.calls['news', 200] += 1
+    return web.json_response({'appnews': {'appid': int(app_id), 'newsitems': [item]}}, headers={'ETag': etag})
+
+  async def _app_details(self, request: web.Request) -> web.StreamResponse:
+    error = await self._simulate('appdetails')
+    if error is not None:
+      return error
+    app_id = request.query.get('appids', '0')
+    self.calls['appdetails', 200] += 1
+    return web.json_response({app_id: {'success': True, 'data': {
+      'name': f"App {app_id}",
+      'header_image': f"{self.url}/images/{app_id}.png"
+    }}})
+
+  async def _app_list_handler(self, _: web.Request) -> web.StreamResponse:
+    error = await self._simulate('applist')
+    if error is not None:
+      return error
+    if self._app_list is None:
+      self._app_list = json.dumps({'applist': {'apps': synthetic_app_list(self.app_count)}}).encode()
+    self.calls['applist', 200] += 1
+    return web.Response(body=self._app_list, content_type='application/json')
+
+  async def _image(self, _: web.Request) -> web.StreamResponse:
+    self.calls['image', 200] += 1
+    return web.Response(body=png_header(800, 450), content_type='image/png')
+
+class FakeChannel:
+  def __init__(self, discord: 'FakeDiscord', channel_id: int) -> None:
+    self.discord: 'FakeDiscord' = discord
+    self.id: int = channel_id
+
+  async def send(self, embed=None, **kwargs) -> None:
+    await self.discord.record(self.id, embed)
+
+class FakeDiscord:
+  def __init__(self, latency: float = 0.05, global_rate: int = 50, channel_burst: int = 5, channel_period: float = 5.0) -> None:
+    self.latency: float = latency
+    self.global_rate: int = global_rate
+    self.channel_burst: int = channel_burst
+    self.channel_period: float = channel_period
+    self.sends: int = 0
+    self.rate_limited: int = 0
+    self.sent_by_channel: Counter = Counter()
+    self._global: deque = deque()
+    self._channels: dict[int, deque] = {}
+    self._channel_objects: dict[int, FakeChannel] = {}
+
+  def get_channel(self, channel_id: int) -> FakeChannel:
+    channel = self._channel_objects.get(channel_id)
+    if channel is None:
+      channel = self._channel_objects[channel_id] = FakeChannel(self, channel_id)
+    return channel
+
+  def get_partial_messageable(self, channel_id: int) -> FakeChannel:
+    return self.get_channel(channel_id)
+
+  async def record(self, channel_id: int, embed) -> None:
+    window = self._channels.setdefault(channel_id, deque())
+    while True:
+      now = time.monotonic()
+      self._expire(self._global, now - 1.0)
+      self._expire(window, now - self.channel_period)
+      retry_after = 0.0
+      if len(self._global) >= self.global_rate:
+        retry_after = self._global[0] + 1.0 - now
+      if len(window) >= self.channel_burst:
+        retry_after = max(retry_after, window[0] + self.channel_period - now)
+      if retry_after <= 0:
+        break
+      self.rate_limited += 1
+      await asyncio.sleep(retry_after)
+    self._global.append(now)
+    window.append(now)
+    await asyncio.sleep(self.latency)
+    self.sends += 1
+    self.sent_by_channel[channel_id] += 1
+
+  @staticmethod
+  def _expire(window: deque, before: float) -> None:
+    while window and window[0] <= before:
+      window.popleft()
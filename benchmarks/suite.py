@@ -0,0 +1,182 @@
+import argparse
+import json
+import os
+import pathlib
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+os.environ.setdefault('DB_PATH', 'sqlite+aiosqlite:///:memory:')
+
+from benchmarks.applist import synthetic_app_list
+from utils.formatting import SteamFormatter
+from utils.matching import Matcher, SearchIndex
+
+CORPUS_PATH = pathlib.Path(__file__).parent / 'corpus'
+MATCH_QUERIES = ['counter strike', 'dark souls', 'witcher', 'hollow knight silksong', 'fn']
+
+Case = Callable[[], Callable[[], Any]]
+
+class Fixtures:
+  def __init__(self, app_count: int) -> None:
+    self.app_count: int = app_count
+    self._apps: Optional[list[dict]] = None
+    self._index: Optional[SearchIndex] = None
+
+  @property
+  def apps(self) -> list[dict]:
+    if self._apps is None:
+      self._apps = synthetic_app_list(self.app_count)
+    return self._apps
+
+  @property
+  def index(self) -> SearchIndex:
+    if self._index is None:
+      self._index = SearchIndex.build(app['name'] for app in self.apps)
+    return self._index
+
+def corpus(name: str) -> str:
+  return (CORPUS_PATH / f"{name}.bbcode").read_text(encoding='utf-8')
+
+def clean_content_case(name: str) -> Case:
+  def setup() -> Callable[[], Any]:
+    content = corpus(name)
+    return lambda: SteamFormatter.clean_content(content)
+  return setup
+
+def linear_match_case(fixtures: Fixtures, query: str) -> Case:
+  def setup() -> Callable[[], Any]:
+    apps = fixtures.apps
+    return lambda: Matcher.search_and_sort_by_string(query, apps)
+  return setup
+
+def indexed_match_case(fixtures: Fixtures, query: str) -> Case:
+  def setup() -> Callable[[], Any]:
+    index = fixtures.index
+    return lambda: index.search(query)
+  return setup
+
+def embed_case(name: str) -> Case:
+  def setup() -> Callable[[], Any]:
+    from utils.discord import NewsEmbed
+    news = {
+      'title': 'Patch 1.4.2 is now live',
+      'url': 'https://store.steampowered.com/news/app/570/view/1',
+      'description': SteamFormatter.clean_content(corpus(name)),
+      'published_date': datetime(2024, 5, 17, 18, 30),
+      'image_url': 'https://clan.akamai.steamstatic.com/images/header.png'
+    }
+    game = {'name': 'Dota 2', 'image_url': 'https://cdn.akamai.steamstatic.com/steam/apps/570/header.jpg'}
+    return lambda: NewsEmbed(news=news, game=game).create()
+  return setup
+
+def build_cases(fixtures: Fixtures) -> dict[str, Case]:
+  cases: dict[str, Case] = {}
+  for name in ('short', 'typical', 'patch_notes_large'):
+    cases[f"clean_content/{name}"] = clean_content_case(name)
+  for query in MATCH_QUERIES:
+    cases[f"matcher_linear/{query}"] = linear_match_case(fixtures, query)
+  for query in MATCH_QUERIES:
+    cases[f"search_index/{query}"] = indexed_match_case(fixtures, query)
+  for name in ('short', 'patch_notes_large'):
+    cases[f"news_embed/{name}"] = embed_case(name)
+  return cases
+
+def percentile(values: list[float], q: float) -> float:
+  ordered = sorted(values)
+  return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def calibrate(func: Callable[[], Any], batch_time: float) -> int:
+  number = 1
+  while True:
+    started = time.perf_counter()
+    for _ in range(number):
+      func()
+    if time.perf_counter() - started >= batch_time:
+      return number
+    number *= 2
+
+def measure(func: Callable[[], Any], min_time: float, min_runs: int, max_runs: int, batch_time: float) -> dict:
+  func()
+  number = calibrate(func, batch_time)
+  timings: list[float] = []
+  started = time.perf_counter()
+  while len(timings) < max_runs and (len(timings) < min_runs or time.perf_counter() - started < min_time):
+    run_started = time.perf_counter()
+    for _ in range(number):
+      func()
+    timings.append((time.perf_counter() - run_started) / number)
+
+  tracemalloc.start()
+  func()
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+
+  return {
+    'runs': len(timings),
+    'calls_per_run': number,
+    'ops_per_second': len(timings) / sum(timings),
+    'p50_ms': percentile(timings, 0.50) * 1000,
+    'p95_ms': percentile(timings, 0.95) * 1000,
+    'p99_ms': percentile(timings, 0.99) * 1000,
+    'peak_kib': peak / 1024
+  }
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float) -> list[str]:
+  regressions = []
+  for name, result in results.items():
+    reference = baseline.get(name)
+    if not reference:
+      continue
+    for metric in ('p50_ms', 'peak_kib'):
+      if reference[metric] and result[metric] > reference[metric] * (1 + threshold):
+        regressions.append(
+          f"{name} {metric} {reference[metric]:.3f} -> {result[metric]:.3f} (+{result[metric] / reference[metric] - 1:.0%})"
+        )
+  return regressions
+
+def main(args: argparse.Namespace) -> int:
+  fixtures = Fixtures(args.apps)
+  cases = {name: case for name, case in build_cases(fixtures).items() if not args.filter or args.filter in name}
+  baseline: dict[str, dict] = {}
+  if args.compare:
+    with open(args.compare, encoding='utf-8') as file:
+      baseline = json.load(file)['results']
+
+  print(f"{'case':<36} {'runs':>6} {'ops/s':>10} {'p50':>10} {'p95':>10} {'p99':>10} {'peak':>10} {'vs base':>8}")
+  results: dict[str, dict] = {}
+  for name, setup in cases.items():
+    result = results[name] = measure(setup(), args.min_time, args.min_runs, args.max_runs, args.batch_ms / 1000)
+    reference = baseline.get(name)
+    delta = f"{result['p50_ms'] / reference['p50_ms'] - 1:>+7.0%}" if reference and reference['p50_ms'] else ''
+    print(
+      f"{name:<36} {result['runs']:>6} {result['ops_per_second']:>10.1f} {result['p50_ms']:>8.3f}ms "
+      f"{result['p95_ms']:>8.3f}ms {result['p99_ms']:>8.3f}ms {result['peak_kib']:>7.0f}KiB {delta:>8}"
+    )
+
+  if args.save:
+    os.makedirs(os.path.dirname(args.save) or '.', exist_ok=True)
+    with open(args.save, 'w', encoding='utf-8') as file:
+      json.dump({'python': platform.python_version(), 'apps': args.apps, 'results': results}, file, indent=2)
+    print(f"Results saved to {args.save}")
+
+  regressions = compare(results, baseline, args.threshold)
+  for regression in regressions:
+    print(f"REGRESSION {regression}")
+  return 1 if regressions else 0
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmark clean_content, the game matchers and NewsEmbed.create on offline fixtures.')
+  parser.add_argument('--filter', help='only run the cases whose name contains this text')
+  parser.add_argument('--apps', type=int, default=200000, help='size of the synthetic Steam app list')
+  parser.add_argument('--min-time', type=float, default=1.0, help='minimum measuring time per case, in seconds')
+  parser.add_argument('--min-runs', type=int, default=5)
+  parser.add_argument('--max-runs', type=int, default=10000)
+  parser.add_argument('--batch-ms', type=float, default=1.0, help='minimum duration of one run, fast cases repeat the call until they reach it')
+  parser.add_argument('--save', help='write the results to this JSON file, to use later as a baseline')
+  parser.add_argument('--compare', help='baseline JSON file written by --save')
+  parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown before a case fails, 0.25 = 25%%')
+  sys.exit(main(parser.parse_args()))
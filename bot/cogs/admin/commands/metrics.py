@@ -0,0 +1,80 @@
+import discord
+from bot.decorators import owner_only
+from discord.ext import commands
+from discord import app_commands
+from utils.discord import DiscordBot
+from utils.metrics import Counter, Histogram, metrics
+
+class MetricsCommands(commands.Cog):
+  def __init__(self, bot: DiscordBot) -> None:
+    self.bot = bot
+
+  @app_commands.command(name='nx_metrics', description='Afficher les métriques du bot')
+  @owner_only()
+  async def show_metrics(self, interaction: discord.Interaction) -> None:
+    lines = [
+      "**Polling**",
+      f"Cycles : {self._count('news_cycle_seconds')} ({self._latency('news_cycle_seconds')}), "
+      f"{self._total('news_cycle_errors_total')} en erreur",
+      f"Jeux interrogés : {self._total('news_games_polled_total')} | Jeux planifiés : {self._total('news_poll_targets')} | "
+      f"Nouvelles actualités : {self._total('news_articles_total')}",
+      "**Steam**",
+      *(
+        f"{endpoint} : {self._total('steam_requests_total', endpoint=endpoint)} requête(s), "
+        f"{self._errors(endpoint)} échec(s), {self._latency('steam_request_seconds', endpoint=endpoint)}"
+        for endpoint in ('news', 'appdetails', 'applist')
+      ),
+      "**Formatage**",
+      f"clean_content : {self._latency('formatter_clean_content_seconds')} | Lots : {self._latency('news_render_seconds')}",
+      "**Cache d'identité**",
+      f"Serveurs : {self._hit_rate('servers')} | Jeux : {self._hit_rate('games')}",
+      "**Base de données**",
+      *(
+        f"{operation} : {self._count('db_operation_seconds', operation=operation)} ({self._latency('db_operation_seconds', operation=operation)})"
+        for operation in ('read', 'write', 'unit_of_work', 'commit', 'upsert')
+      ),
+      "**Envoi**",
+      f"{self._total('news_deliveries_total', result='sent')} envoyée(s), {self._total('news_deliveries_total', result='failed')} échouée(s), "
+      f"{self._total('news_delivery_queue_depth')} en attente, {self._latency('news_delivery_latency_seconds')}"
+    ]
+    await interaction.response.send_message('\n'.join(lines), ephemeral=True)
+
+  @staticmethod
+  def _total(name: str, **labels: str) -> int:
+    metric = metrics.get(name)
+    if not isinstance(metric, Counter):
+      return 0
+    return int(metric.value(**labels) if labels else metric.total())
+
+  @staticmethod
+  def _errors(endpoint: str) -> int:
+    metric = metrics.get('steam_requests_total')
+    if not isinstance(metric, Counter):
+      return 0
+    return int(sum(
+      value for labels, value in metric.values.items()
+      if ('endpoint', endpoint) in labels and ('status', '200') not in labels and ('status', '304') not in labels
+    ))
+
+  @classmethod
+  def _hit_rate(cls, cache: str) -> str:
+    hits = cls._total('identity_cache_lookups_total', cache=cache, result='hit')
+    lookups = hits + cls._total('identity_cache_lookups_total', cache=cache, result='miss')
+    if not lookups:
+      return "aucune recherche"
+    return f"{hits / lookups:.0%} de succès sur {lookups} recherche(s), {cls._total('identity_cache_entries', cache=cache)} en cache"
+
+  @staticmethod
+  def _count(name: str, **labels: str) -> int:
+    metric = metrics.get(name)
+    return metric.count(**labels) if isinstance(metric, Histogram) else 0
+
+  @staticmethod
+  def _latency(name: str, **labels: str) -> str:
+    metric = metrics.get(name)
+    if not isinstance(metric, Histogram) or not metric.count(**labels):
+      return "aucune mesure"
+    return f"p50 {metric.quantile(0.50, **labels) * 1000:.0f}ms, p95 {metric.quantile(0.95, **labels) * 1000:.0f}ms"
+
+async def setup(bot: DiscordBot) -> None:
+  await bot.add_cog(MetricsCommands(bot))
@@ -0,0 +1,33 @@
+import os
+import discord
+from bot.decorators import owner_only
+from config import config
+from discord.ext import commands
+from discord import app_commands
+from utils.discord import DiscordBot
+
+class ProfilingCommands(commands.Cog):
+  def __init__(self, bot: DiscordBot) -> None:
+    self.bot = bot
+
+  @app_commands.command(name='nx_queries', description='Afficher les requêtes SQL les plus coûteuses')
+  @owner_only()
+  async def show_queries(self, interaction: discord.Interaction, limit: app_commands.Range[int, 1, 20] = 10) -> None:
+    profiler = self.bot.database.profiler
+    if not profiler:
+      await interaction.response.send_message("Le profilage SQL est désactivé (`DB_PROFILING=on`).", ephemeral=True)
+      return
+
+    dump_path = os.path.join(config.data_path, 'query_stats.json')
+    profiler.dump(dump_path)
+    lines = [f"{profiler.slow_queries} requête(s) lente(s), statistiques complètes dans `{dump_path}`"]
+    for stats in profiler.report(limit=limit):
+      call_site = next(iter(stats['call_sites']), 'unknown')
+      lines.append(
+        f"`{stats['total_ms']:.0f}ms` {stats['calls']} appel(s), max {stats['max_ms']:.0f}ms, "
+        f"{stats['max_rows']} ligne(s) max, {call_site} : `{stats['shape'][:120]}`"
+      )
+    await interaction.response.send_message('\n'.join(lines)[:2000], ephemeral=True)
+
+async def setup(bot: DiscordBot) -> None:
+  await bot.add_cog(ProfilingCommands(bot))
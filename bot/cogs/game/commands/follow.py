@@ -1,8 +1,10 @@
 import discord
-from sqlalchemy.future import select
-from bot.decorators import ensure_server, ensure_steam_game
+from bot.decorators import ensure_server, ensure_steam_game, with_unit_of_work
 from bot.services.news import NewsService
-from models import FollowedGame
+from bot.services.search import game_search
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.future import select
+from models import FollowedGame, News, queries
 from discord.ext import commands
 from discord import app_commands
 from utils.discord import DiscordBot
@@ -10,29 +12,51 @@ from utils.discord import DiscordBot
 class FollowCommands(commands.Cog):
   def __init__(self, bot: DiscordBot) -> None:
     self.bot = bot
-    self.server = None
-    self.game = None
     self.news_service = NewsService(bot.database)
 
   @app_commands.command(name='nx_follow', description='placeholder')
   @app_commands.checks.has_permissions(administrator=True)
-  @ensure_server
+  @with_unit_of_work
   @ensure_steam_game
+  @ensure_server
   async def follow(self, interaction: discord.Interaction, steam_id: str, channel: discord.TextChannel) -> None:
-    await interaction.response.defer(ephemeral=True, thinking=True)
+    uow, server, game = interaction.extras['uow'], interaction.extras['server'], interaction.extras['game']
 
-    if not self.game:
+    if not game:
+      await uow.commit()
       await interaction.followup.send(f"Le jeu n'existe pas.")
       return
 
-    find_followed_game = await self.bot.database.execute(select(FollowedGame).where(FollowedGame.game_id == self.game.id, FollowedGame.server_id == self.server.id))
+    find_followed_game = await uow.execute(queries.followed_game(game.id, server.id))
     followed_game = find_followed_game.scalar_one_or_none()
     if followed_game:
-      await interaction.followup.send(f"{self.game.name} est déjà suivi dans le channel {followed_game.channel}")
+      await uow.commit()
+      await interaction.followup.send(f"{game.name} est déjà suivi dans le channel {followed_game.channel}")
       return
 
-    followed_game: FollowedGame = await self.bot.database.insert(FollowedGame(discord_channel_id=channel.id, game_id=self.game.id, server_id=self.server.id))
-    await interaction.followup.send(f"Les prochaines actualités de {self.game.name} seront publiées dans le channel {followed_game.channel}")
+    inserted = await uow.execute(
+      insert(FollowedGame)
+      .values(
+        discord_channel_id=str(channel.id),
+        game_id=game.id,
+        server_id=server.id,
+        last_news_steam_id=select(News.steam_id).where(News.game_id == game.id).scalar_subquery()
+      )
+      .on_conflict_do_nothing(index_elements=['game_id', 'server_id'])
+    )
+    if not inserted.rowcount:
+      followed_game = (await uow.execute(queries.followed_game(game.id, server.id))).scalar_one()
+      await uow.commit()
+      await interaction.followup.send(f"{game.name} est déjà suivi dans le channel {followed_game.channel}")
+      return
+
+    await uow.commit()
+    game_search.invalidate_followed(interaction.guild.id)
+    await interaction.followup.send(f"Les prochaines actualités de {game.name} seront publiées dans le channel {channel.mention}")
+
+  @follow.autocomplete('steam_id')
+  async def follow_steam_id_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+    return await game_search.complete_catalog(current)
 
 async def setup(bot: DiscordBot) -> None:
   await bot.add_cog(FollowCommands(bot))
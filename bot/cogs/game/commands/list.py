@@ -1,9 +1,7 @@
 import discord
-from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
-from bot.decorators import ensure_server
+from bot.decorators import ensure_server, with_unit_of_work
 from bot.helpers.game import GameHelper
-from models import FollowedGame
+from models import queries
 from discord.ext import commands
 from discord import app_commands
 from utils.discord import DiscordBot
@@ -11,16 +9,17 @@ from utils.discord import DiscordBot
 class TrackedCommands(commands.Cog):
   def __init__(self, bot: DiscordBot) -> None:
     self.bot = bot
-    self.server = None
 
   @app_commands.command(name='nx_list', description='Lister les jeux suivis')
   @app_commands.checks.has_permissions(administrator=True)
+  @with_unit_of_work
   @ensure_server
   async def tracked(self, interaction: discord.Interaction) -> None:
-    await interaction.response.defer(ephemeral=True, thinking=True)
+    uow, server = interaction.extras['uow'], interaction.extras['server']
 
-    find_followed_games = await self.bot.database.execute(select(FollowedGame).options(joinedload(FollowedGame.game)).where(FollowedGame.server_id == self.server.id))
+    find_followed_games = await uow.execute(queries.followed_games_for_server(server.id))
     followed_games = find_followed_games.scalars().all()
+    await uow.commit()
     if not followed_games:
       await interaction.followup.send(f"Aucun jeu n'est suivi.")
       return
@@ -1,8 +1,8 @@
 import discord
-from sqlalchemy.future import select
-from bot.decorators import ensure_server, ensure_game
+from bot.decorators import ensure_server, ensure_game, with_unit_of_work
 from bot.services.news import NewsService
-from models import Game, FollowedGame, Server
+from bot.services.search import game_search
+from models import queries
 from discord.ext import commands
 from discord import app_commands
 from utils.discord import DiscordBot
@@ -10,28 +10,35 @@ from utils.discord import DiscordBot
 class UnfollowCommands(commands.Cog):
   def __init__(self, bot: DiscordBot) -> None:
     self.bot = bot
-    self.server = None
-    self.game = None
 
   @app_commands.command(name='nx_unfollow', description='placeholder')
   @app_commands.checks.has_permissions(administrator=True)
+  @with_unit_of_work
   @ensure_server
   @ensure_game
   async def unfollow(self, interaction: discord.Interaction, steam_id: str) -> None:
-    await interaction.response.defer(ephemeral=True, thinking=True)
+    uow, server, game = interaction.extras['uow'], interaction.extras['server'], interaction.extras['game']
 
-    if not self.game:
+    if not game:
+      await uow.commit()
       await interaction.followup.send(f"Le jeu n'existe pas.")
       return
     
-    find_followed_game = await self.bot.database.execute(select(FollowedGame).where(FollowedGame.game_id == self.game.id, FollowedGame.server_id == self.server.id))
+    find_followed_game = await uow.execute(queries.followed_game(game.id, server.id))
     followed_game = find_followed_game.scalar_one_or_none()
     if not followed_game:
-      await interaction.followup.send(f"{self.game.name} n'est pas suivi")
+      await uow.commit()
+      await interaction.followup.send(f"{game.name} n'est pas suivi")
       return
   
-    followed_game: FollowedGame = await self.bot.database.delete(followed_game)
-    await interaction.followup.send(f"{self.game.name} ne sera plus suivi")
+    await uow.delete(followed_game)
+    await uow.commit()
+    game_search.invalidate_followed(interaction.guild.id)
+    await interaction.followup.send(f"{game.name} ne sera plus suivi")
+
+  @unfollow.autocomplete('steam_id')
+  async def unfollow_steam_id_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+    return await game_search.complete_followed(interaction.guild.id, current)
 
 async def setup(bot: DiscordBot) -> None:
   await bot.add_cog(UnfollowCommands(bot))
@@ -1,83 +1,248 @@
+import time
 from collections import defaultdict
-from sqlalchemy import update
-from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
+from typing import Any, Optional, Union
 from discord.ext import commands, tasks
+from sqlalchemy import update
+from config import config
+from utils.cache import LRUCache
 from utils.logging import logger
+from utils.metrics import metrics
+from utils.pipeline import Pipeline
+from bot.services.delivery import DEFAULT_PRIORITY, PREMIUM_PRIORITY, Delivery, DeliveryScheduler
+from bot.services.leases import PartitionLeases
 from bot.services.news import NewsService
-from models import Game, FollowedGame, News
+from bot.services.polling import PollScheduler
+from models import FollowedGame, Game, News, queries
 from utils.discord import DiscordBot, NewsEmbed
 
 log = logger.get_logger(__name__)
 
+NEWS_CYCLE_SECONDS = metrics.histogram('news_cycle_seconds', 'Duration of a news check cycle that polled at least one game')
+NEWS_GAMES_POLLED = metrics.counter('news_games_polled_total', 'Games polled on Steam')
+NEWS_ARTICLES = metrics.counter('news_articles_total', 'New announcements found')
+NEWS_PIPELINE_ERRORS = metrics.counter('news_pipeline_errors_total', 'News pipeline failures by stage')
+NEWS_CYCLE_ERRORS = metrics.counter('news_cycle_errors_total', 'News check cycles aborted by an unexpected error')
+NEWS_POLL_TARGETS = metrics.gauge('news_poll_targets', 'Games scheduled for polling by this worker')
+NEWS_LAST_CYCLE = metrics.gauge('news_last_cycle_timestamp_seconds', 'Unix time of the last completed news check cycle')
+
 class NewsTask(commands.Cog):
   def __init__(self, bot: DiscordBot) -> None:
     self.bot = bot
     self.news_service = NewsService(bot.database)
+    self.delivery = DeliveryScheduler(
+      bot,
+      global_rate=config.delivery_global_rate,
+      channel_burst=config.delivery_channel_burst,
+      channel_period=config.delivery_channel_period,
+      workers=config.delivery_workers
+    )
+    self.poller = PollScheduler(
+      min_interval=config.poll_min_interval,
+      max_interval=config.poll_max_interval,
+      budget_per_minute=config.poll_budget_per_minute
+    )
+    self.leases = PartitionLeases(
+      bot.database,
+      config.worker_id,
+      partitions=config.poll_partitions,
+      ttl=config.lease_ttl_seconds
+    )
+    self._synced_at: Optional[float] = None
+    self._swept_at: Optional[float] = None
+    self._delivery_attempts: LRUCache = LRUCache(10000)
+    self.check_for_news.change_interval(seconds=config.poll_tick_seconds)
     self.check_for_news.start()
 
-  @tasks.loop(seconds=1800)
+  async def cog_unload(self) -> None:
+    self.check_for_news.cancel()
+    await self.delivery.close()
+    await self.leases.release()
+
+  @tasks.loop(seconds=30)
   async def check_for_news(self) -> None:
-    log.info('Checking Steam news...')
-    
+    steam_ids = []
     try:
-      followed_games = (await self.bot.database.execute(
-        select(FollowedGame)
-        .options(
-          joinedload(FollowedGame.game).joinedload(Game.news),
-          joinedload(FollowedGame.server)
-        )
-      )).scalars().all()
-
-      if not followed_games:
-        log.info("No game followed.")
-        return
-
-      games_by_steam_id = defaultdict(list)
-      for followed_game in followed_games:
-        games_by_steam_id[followed_game.game.steam_id].append(followed_game)
-
-      new_articles = []
-
-      for game_steam_id, servers_following_game in games_by_steam_id.items():
-        try:
-          steam_news_id = await self.news_service.get_news_by_steam_id(game_steam_id, 'id')
-          if not steam_news_id:
-            continue
-            
-          game = servers_following_game[0].game
-          latest_news = game.news
-
-          if latest_news and steam_news_id.get('steam_id') == latest_news.steam_id:
-            continue
-
-          steam_news = await self.news_service.get_news_by_steam_id(game_steam_id)
-          steam_news['game_id'] = game.id
-
-          if latest_news:
-            await self.bot.database.execute(
-              update(News).where(News.id == latest_news.id).values(**steam_news)
-            )
-          else:
-            await self.bot.database.insert(News(**steam_news))
-
-          new_articles.append(steam_news)
-
-          for followed_game in servers_following_game:
-            news_embed = NewsEmbed(news=steam_news, game=followed_game.game.to_dict())
-            channel = self.bot.get_channel(int(followed_game.discord_channel_id))
-            await channel.send(embed=news_embed.create())
-        except Exception as e:
-          log.error(f"Error processing game {game_steam_id}: {e}")
-          continue
-
-      log.info(f"{len(new_articles)} new article(s) found.")
+      if self.leases.due() and await self.leases.renew():
+        self._synced_at = None
+      await self._sync_poll_targets()
+      self.delivery.reset_stats()
+      await self._sweep_pending_deliveries()
+      steam_ids = self.poller.due()
+      if steam_ids:
+        await self._check_steam_news(steam_ids)
+      self._log_delivery_stats()
     except Exception as e:
+      NEWS_CYCLE_ERRORS.inc()
       log.error(f"Unexpected error during news check: {e}")
+    finally:
+      self.poller.reschedule(steam_ids)
+
+  async def _check_steam_news(self, steam_ids: list[str]) -> None:
+    log.info(f"Checking Steam news for {len(steam_ids)} game(s)...")
+    started = time.perf_counter()
+    NEWS_GAMES_POLLED.inc(len(steam_ids))
+    followed_games = (await self.bot.database.execute(queries.followed_games_for_steam_ids(steam_ids))).scalars().all()
+
+    games_by_steam_id = defaultdict(list)
+    for followed_game in followed_games:
+      games_by_steam_id[followed_game.game.steam_id].append(followed_game)
+
+    jobs = (
+      {'steam_id': steam_id, 'game': servers_following_game[0].game, 'followed_games': servers_following_game}
+      for steam_id, servers_following_game in games_by_steam_id.items()
+    )
+    new_articles = await self._create_pipeline().run(jobs)
+    NEWS_CYCLE_SECONDS.observe(time.perf_counter() - started)
+    NEWS_ARTICLES.inc(len(new_articles))
+    NEWS_LAST_CYCLE.set(time.time())
+
+    log.info(f"{len(new_articles)} new article(s) found.")
+    cache_stats = self.bot.steam.response_cache.stats()
+    log.info(
+      f"Steam news cache : {cache_stats['hits']} unchanged, {cache_stats['misses']} changed, "
+      f"{cache_stats['bytes_saved']} byte(s) saved ({cache_stats['hit_rate']:.0%} hit rate)"
+    )
+
+  def _log_delivery_stats(self) -> None:
+    delivery_stats = self.delivery.stats()
+    if delivery_stats['sent'] or delivery_stats['failed']:
+      log.info(
+        f"News delivery : {delivery_stats['sent']} sent, {delivery_stats['failed']} failed, "
+        f"p50 {delivery_stats['p50']:.2f}s, p95 {delivery_stats['p95']:.2f}s, p99 {delivery_stats['p99']:.2f}s"
+      )
 
   @check_for_news.before_loop
   async def before_check_for_news(self) -> None:
     await self.bot.wait_until_ready()
 
+  async def _sync_poll_targets(self) -> None:
+    if self._synced_at is not None and time.monotonic() - self._synced_at < config.poll_sync_seconds:
+      return
+    targets = (await self.bot.database.execute(queries.poll_targets())).all()
+    self.poller.sync(target for target in targets if self.leases.owns(target[0]))
+    self._synced_at = time.monotonic()
+    poll_stats = self.poller.stats()
+    NEWS_POLL_TARGETS.set(poll_stats['targets'])
+    log.info(
+      f"Polling {poll_stats['targets']} game(s), median interval {poll_stats['median_interval'] / 60:.0f} min, "
+      f"{poll_stats['polls']} poll(s) so far, {poll_stats['throttled']} throttled tick(s)"
+    )
+
+  async def _sweep_pending_deliveries(self) -> None:
+    if self._swept_at is not None and time.monotonic() - self._swept_at < config.delivery_sweep_seconds:
+      return
+    self._swept_at = time.monotonic()
+    rows = (await self.bot.database.execute(queries.pending_deliveries())).all()
+    pending = defaultdict(list)
+    for followed_game, news in rows:
+      if self.bot.owns_guild(int(followed_game.server.discord_id)):
+        pending[news].append(followed_game)
+    for news, followed_games in pending.items():
+      await self._deliver(news.to_dict(), followed_games[0].game, followed_games)
+    if pending:
+      log.info(f"{sum(len(followed_games) for followed_games in pending.values())} pending delivery(ies) sent.")
+
+  def _create_pipeline(self) -> Pipeline:
+    return (
+      Pipeline(queue_size=config.news_queue_size, on_error=self._on_pipeline_error)
+      .add_stage('fetch', self._fetch_news, workers=config.news_fetch_workers)
+      .add_stage(
+        'format',
+        self._format_news,
+        workers=config.news_format_workers,
+        batch_size=config.news_format_batch_size,
+        batch_wait=config.news_format_batch_wait_ms / 1000
+      )
+      .add_stage(
+        'persist',
+        self._persist_news,
+        workers=config.news_persist_workers,
+        batch_size=config.news_persist_batch_size,
+        batch_wait=config.news_persist_batch_wait_ms / 1000
+      )
+      .add_stage('deliver', self._deliver_news, workers=config.news_deliver_workers)
+    )
+
+  async def _fetch_news(self, job: dict) -> Optional[dict]:
+    steam_news = await self.news_service.get_news(job['steam_id'], only_changed=True)
+    if not steam_news:
+      return None
+
+    latest_news = job['game'].news
+    if latest_news and steam_news.steam_id == latest_news.steam_id:
+      return None
+    self.poller.observe(job['steam_id'], steam_news.published_date)
+    job['steam_news'] = steam_news
+    return job
+
+  async def _format_news(self, jobs: list[dict]) -> list[Union[dict, Exception]]:
+    await self.news_service.render_many([job['steam_news'] for job in jobs])
+    outputs: list[Union[dict, Exception]] = []
+    for job in jobs:
+      try:
+        news = await job['steam_news'].to_dict()
+      except Exception as e:
+        outputs.append(e)
+        continue
+      news['game_id'] = job['game'].id
+      job['news'] = news
+      outputs.append(job)
+    return outputs
+
+  async def _persist_news(self, jobs: list[dict]) -> list[Union[dict, Exception]]:
+    errors = await self.bot.database.upsert_many(News, [job['news'] for job in jobs], index_elements=['game_id'])
+    return [error or job for job, error in zip(jobs, errors)]
+
+  async def _deliver_news(self, job: dict) -> dict:
+    await self._deliver(job['news'], job['game'], job['followed_games'])
+    return job['news']
+
+  async def _deliver(self, news: dict, game: Game, followed_games: list[FollowedGame]) -> None:
+    local_followed_games = [
+      followed_game for followed_game in followed_games
+      if self.bot.owns_guild(int(followed_game.server.discord_id))
+    ]
+    if not local_followed_games:
+      return
+    embed = NewsEmbed(news=news, game=game.to_dict()).create()
+    delivered = await self.delivery.deliver([
+      Delivery(
+        channel_id=int(followed_game.discord_channel_id),
+        embed=embed,
+        priority=PREMIUM_PRIORITY if followed_game.server.premium_status else DEFAULT_PRIORITY
+      )
+      for followed_game in local_followed_games
+    ])
+    settled_ids = [
+      followed_game.id for followed_game, sent in zip(local_followed_games, delivered)
+      if self._settle_delivery(followed_game, news['steam_id'], sent)
+    ]
+    if not settled_ids:
+      return
+    await self.bot.database.execute(
+      update(FollowedGame)
+      .where(FollowedGame.id.in_(settled_ids))
+      .values(last_news_steam_id=news['steam_id'])
+    )
+
+  def _settle_delivery(self, followed_game: FollowedGame, steam_id: str, sent: bool) -> bool:
+    key = (followed_game.id, steam_id)
+    if sent:
+      self._delivery_attempts.pop(key)
+      return True
+    attempts = self._delivery_attempts.get(key, 0) + 1
+    channel_id = int(followed_game.discord_channel_id)
+    if attempts < config.delivery_max_attempts and not self.delivery.is_unavailable(channel_id):
+      self._delivery_attempts.set(key, attempts)
+      return False
+    self._delivery_attempts.pop(key)
+    log.warning(f"Giving up on news {steam_id} for channel {channel_id} after {attempts} attempt(s)")
+    return True
+
+  def _on_pipeline_error(self, stage: str, job: Any, error: Exception) -> None:
+    self.bot.steam.response_cache.pop(str(job['steam_id']))
+    NEWS_PIPELINE_ERRORS.inc(stage=stage)
+    log.error(f"Error processing game {job['steam_id']} ({stage}): {error}")
+
 async def setup(bot) -> None:
   await bot.add_cog(NewsTask(bot))
@@ -1,2 +1,4 @@
 from bot.decorators.game import ensure_game, ensure_steam_game
+from bot.decorators.owner import owner_only
 from bot.decorators.server import ensure_server
+from bot.decorators.unit_of_work import with_unit_of_work
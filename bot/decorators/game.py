@@ -1,18 +1,15 @@
 from functools import wraps
 import discord
-from sqlalchemy.future import select
+from sqlalchemy.dialects.sqlite import insert
 from models import Game, News
 from utils.steamer import steam
 
 def ensure_game(func):
   @wraps(func)
   async def wrapper(self, interaction: discord.Interaction, steam_id, *args, **kwargs):
-    find_game = await self.bot.database.execute(select(Game).where(Game.steam_id == steam_id))
-    game = find_game.scalar_one_or_none()
-    if not game:
-      self.game = None
+    game = await self.bot.identity_cache.get_game(interaction.extras['uow'], steam_id)
 
-    self.game = game
+    interaction.extras['game'] = game
     return await func(self, interaction, steam_id, *args, **kwargs)
   
   return wrapper
@@ -20,24 +17,30 @@ def ensure_game(func):
 def ensure_steam_game(func):
   @wraps(func)
   async def wrapper(self, interaction: discord.Interaction, steam_id, *args, **kwargs):
+    interaction.extras['game'] = None
     steam_game = await steam.get_game_info(steam_id)
-    if not steam_game:
-      self.game = None
 
     if steam_game:
-      find_game = await self.bot.database.execute(select(Game).where(Game.steam_id == steam_id))
-      game = find_game.scalar_one_or_none()
-      if not game:
-        game: Game = await self.bot.database.insert(Game(name=steam_game.get('name'), image_url=steam_game.get('image_url'), steam_id=steam_id))
-
-      find_news = await self.bot.database.execute(select(News).where(News.game_id == game.id))
-      news = find_news.scalar_one_or_none()
-      if not news:
-        steam_news = await self.news_service.get_news_by_steam_id(steam_id)
-        if steam_news:
-          await self.bot.database.insert(News(**steam_news, game_id=game.id))
-
-      self.game = game
+      uow = interaction.extras['uow']
+      game: Game = await self.bot.identity_cache.get_game(uow, steam_id)
+
+      news = None
+      if game is None or not game.news:
+        steam_news = await self.news_service.get_news(steam_id)
+        news = await steam_news.to_dict() if steam_news else None
+
+      if game is None:
+        game = await self.bot.identity_cache.get_game(
+          uow,
+          steam_id,
+          defaults={'name': steam_game.get('name'), 'image_url': steam_game.get('image_url')}
+        )
+
+      if news:
+        await uow.execute(insert(News).values(**news, game_id=game.id).on_conflict_do_nothing())
+        uow.after_commit(lambda: self.bot.identity_cache.invalidate_game(steam_id))
+
+      interaction.extras['game'] = game
     return await func(self, interaction, steam_id, *args, **kwargs)
   
   return wrapper
@@ -0,0 +1,9 @@
+import discord
+from discord import app_commands
+from config import config
+
+def owner_only():
+  def predicate(interaction: discord.Interaction) -> bool:
+    return bool(config.discord_owner_id) and str(interaction.user.id) == str(config.discord_owner_id)
+
+  return app_commands.check(predicate)
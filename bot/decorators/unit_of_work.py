@@ -0,0 +1,16 @@
+from functools import wraps
+import discord
+
+def with_unit_of_work(func):
+  @wraps(func)
+  async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
+    if 'uow' in interaction.extras:
+      return await func(self, interaction, *args, **kwargs)
+
+    if not interaction.response.is_done():
+      await interaction.response.defer(ephemeral=True, thinking=True)
+    async with self.bot.database.unit_of_work() as uow:
+      interaction.extras['uow'] = uow
+      return await func(self, interaction, *args, **kwargs)
+  
+  return wrapper
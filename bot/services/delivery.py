@@ -0,0 +1,161 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+import discord
+from utils.cache import LRUCache, TTLCache
+from utils.logging import logger
+from utils.metrics import metrics
+from utils.ratelimit import SlidingWindow
+
+log = logger.get_logger(__name__)
+
+DELIVERIES = metrics.counter('news_deliveries_total', 'Announcement deliveries by result')
+DELIVERY_LATENCY_SECONDS = metrics.histogram('news_delivery_latency_seconds', 'Time between queueing an announcement and its delivery')
+DELIVERY_QUEUE_DEPTH = metrics.gauge('news_delivery_queue_depth', 'Announcements waiting for a delivery worker')
+
+PREMIUM_PRIORITY = 0
+DEFAULT_PRIORITY = 1
+
+@dataclass
+class Delivery:
+  channel_id: int
+  embed: discord.Embed
+  priority: int = DEFAULT_PRIORITY
+
+def percentile(values: list[float], q: float) -> float:
+  if not values:
+    return 0.0
+  ordered = sorted(values)
+  return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class DeliveryScheduler:
+  def __init__(
+    self,
+    bot: discord.Client,
+    global_rate: float = 50.0,
+    channel_burst: int = 5,
+    channel_period: float = 5.0,
+    workers: int = 50,
+    unavailable_ttl: float = 3600.0
+  ) -> None:
+    self.bot: discord.Client = bot
+    self.global_window: SlidingWindow = SlidingWindow(global_rate, 1.0)
+    self.channel_burst: int = channel_burst
+    self.channel_period: float = channel_period
+    self.channel_windows: LRUCache = LRUCache(10000)
+    self.unavailable_channels: TTLCache = TTLCache(10000, ttl=unavailable_ttl)
+    self.workers: int = max(workers, 1)
+    self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+    self.latencies: deque = deque(maxlen=10000)
+    self.sent: int = 0
+    self.failed: int = 0
+    self._sequence = itertools.count()
+    self._tasks: list[asyncio.Task] = []
+    self._deferred: set[asyncio.TimerHandle] = set()
+
+  async def deliver(self, deliveries: list[Delivery]) -> list[bool]:
+    self._ensure_workers()
+    loop = asyncio.get_running_loop()
+    futures = []
+    for delivery in deliveries:
+      future = loop.create_future()
+      self.queue.put_nowait((delivery.priority, next(self._sequence), delivery, future, time.monotonic()))
+      futures.append(future)
+    DELIVERY_QUEUE_DEPTH.set(self.depth())
+    return await asyncio.gather(*futures)
+
+  def stats(self) -> dict:
+    latencies = list(self.latencies)
+    return {
+      'sent': self.sent,
+      'failed': self.failed,
+      'p50': percentile(latencies, 0.50),
+      'p95': percentile(latencies, 0.95),
+      'p99': percentile(latencies, 0.99)
+    }
+
+  def is_unavailable(self, channel_id: int) -> bool:
+    return bool(self.unavailable_channels.get(channel_id))
+
+  def depth(self) -> int:
+    return self.queue.qsize() + len(self._deferred)
+
+  def reset_stats(self) -> None:
+    self.latencies.clear()
+    self.sent = 0
+    self.failed = 0
+
+  async def close(self) -> None:
+    for handle in self._deferred:
+      handle.cancel()
+    self._deferred.clear()
+    for task in self._tasks:
+      task.cancel()
+    await asyncio.gather(*self._tasks, return_exceptions=True)
+    self._tasks = []
+
+  def _ensure_workers(self) -> None:
+    self._tasks = [task for task in self._tasks if not task.done()]
+    while len(self._tasks) < self.workers:
+      self._tasks.append(asyncio.create_task(self._work()))
+
+  async def _work(self) -> None:
+    while True:
+      entry = await self.queue.get()
+      _, _, delivery, future, queued_at = entry
+      delivered = False
+      if not self.is_unavailable(delivery.channel_id):
+        window = self._channel_window(delivery.channel_id)
+        delay = window.try_acquire()
+        if delay > 0:
+          self._defer(entry, delay)
+          continue
+        try:
+          delivered = await self._send(delivery)
+        except Exception as e:
+          log.error(f"Unexpected error delivering to channel {delivery.channel_id}: {e}")
+        finally:
+          window.release()
+      DELIVERY_QUEUE_DEPTH.set(self.depth())
+      latency = time.monotonic() - queued_at
+      self.latencies.append(latency)
+      DELIVERY_LATENCY_SECONDS.observe(latency)
+      if delivered:
+        self.sent += 1
+      else:
+        self.failed += 1
+      DELIVERIES.inc(result='sent' if delivered else 'failed')
+      if not future.done():
+        future.set_result(delivered)
+
+  def _defer(self, entry: tuple, delay: float) -> None:
+    def requeue() -> None:
+      self._deferred.discard(handle)
+      self.queue.put_nowait(entry)
+
+    handle = asyncio.get_running_loop().call_later(delay, requeue)
+    self._deferred.add(handle)
+
+  async def _send(self, delivery: Delivery) -> bool:
+    channel = self.bot.get_channel(delivery.channel_id) or self.bot.get_partial_messageable(delivery.channel_id)
+    try:
+      async with self.global_window.slot():
+        await channel.send(embed=delivery.embed)
+    except (discord.Forbidden, discord.NotFound) as e:
+      self.unavailable_channels.set(delivery.channel_id, True)
+      log.warning(f"Channel {delivery.channel_id} is unavailable, skipping it for now: {e}")
+      return False
+    except discord.HTTPException as e:
+      log.error(f"Failed to deliver to channel {delivery.channel_id}: {e}")
+      return False
+    return True
+
+  def _channel_window(self, channel_id: int) -> SlidingWindow:
+    window: Optional[SlidingWindow] = self.channel_windows.get(channel_id)
+    if window is None:
+      window = SlidingWindow(self.channel_burst, self.channel_period)
+      self.channel_windows.set(channel_id, window)
+    return window
@@ -0,0 +1,78 @@
+import math
+import time
+import zlib
+from typing import Optional
+from sqlalchemy import delete
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.future import select
+from models import PartitionLease, Worker
+from utils.database import Database
+from utils.logging import logger
+
+log = logger.get_logger(__name__)
+
+def partition_of(steam_id: str, partitions: int) -> int:
+  return zlib.crc32(str(steam_id).encode()) % partitions
+
+class PartitionLeases:
+  def __init__(self, db: Database, worker_id: str, partitions: int = 64, ttl: float = 90.0) -> None:
+    self.db: Database = db
+    self.worker_id: str = worker_id
+    self.partitions: int = max(partitions, 1)
+    self.ttl: float = ttl
+    self.owned: frozenset[int] = frozenset()
+    self.renewed_at: Optional[float] = None
+
+  def owns(self, steam_id: str) -> bool:
+    return partition_of(steam_id, self.partitions) in self.owned
+
+  def due(self) -> bool:
+    return self.renewed_at is None or time.monotonic() - self.renewed_at >= self.ttl / 3
+
+  async def renew(self) -> bool:
+    now = time.time()
+    expires_at = now + self.ttl
+    async with self.db.unit_of_work() as uow:
+      await uow.execute(
+        insert(Worker).values(worker_id=self.worker_id, expires_at=expires_at)
+        .on_conflict_do_update(index_elements=['worker_id'], set_={'expires_at': expires_at})
+      )
+      await uow.execute(delete(Worker).where(Worker.expires_at <= now))
+      live_workers = (await uow.execute(select(Worker.worker_id))).scalars().all()
+      leases = (await uow.execute(select(PartitionLease).where(PartitionLease.expires_at > now))).scalars().all()
+
+      fair_share = math.ceil(self.partitions / max(len(live_workers), 1))
+      taken = {lease.partition for lease in leases if lease.worker_id != self.worker_id}
+      mine = sorted(lease.partition for lease in leases if lease.worker_id == self.worker_id)
+      released = mine[fair_share:]
+      mine = mine[:fair_share]
+      free = [partition for partition in range(self.partitions) if partition not in taken and partition not in mine]
+      mine += free[:max(fair_share - len(mine), 0)]
+
+      if released:
+        await uow.execute(delete(PartitionLease).where(
+          PartitionLease.partition.in_(released), PartitionLease.worker_id == self.worker_id
+        ))
+      if mine:
+        statement = insert(PartitionLease)
+        await uow.execute(
+          statement.on_conflict_do_update(
+            index_elements=['partition'],
+            set_={'worker_id': statement.excluded.worker_id, 'expires_at': statement.excluded.expires_at}
+          ),
+          [{'partition': partition, 'worker_id': self.worker_id, 'expires_at': expires_at} for partition in mine]
+        )
+
+    owned = frozenset(mine)
+    changed = owned != self.owned
+    if changed:
+      log.info(f"Worker {self.worker_id} owns {len(owned)}/{self.partitions} partition(s) with {len(live_workers)} live worker(s)")
+    self.owned = owned
+    self.renewed_at = time.monotonic()
+    return changed
+
+  async def release(self) -> None:
+    async with self.db.unit_of_work() as uow:
+      await uow.execute(delete(PartitionLease).where(PartitionLease.worker_id == self.worker_id))
+      await uow.execute(delete(Worker).where(Worker.worker_id == self.worker_id))
+    self.owned = frozenset()
@@ -1,28 +1,69 @@
+import asyncio
+from functools import cached_property
+from typing import Optional
 from utils.database import Database
+from utils.executor import formatting_executor
 from utils.formatting import SteamFormatter
 from utils.logging import logger
+from utils.metrics import metrics
 from utils.steamer import steam
 
 log = logger.get_logger(__name__)
 
+NEWS_FETCH_SECONDS = metrics.histogram('news_fetch_seconds', 'Time to fetch the latest announcement of a game')
+NEWS_FETCHED = metrics.counter('news_fetched_total', 'Announcement fetches by result')
+NEWS_RENDER_SECONDS = metrics.histogram('news_render_seconds', 'Time to render a batch of announcements')
+NEWS_RENDERED = metrics.counter('news_rendered_total', 'Announcements rendered')
+
+class SteamNews():
+  def __init__(self, item: dict):
+    self.item = item
+    self.steam_id = item.get('gid')
+    self.title = item.get('title')
+    self.url = item.get('url')
+    self.published_date = SteamFormatter.clean_date(item.get('date'))
+    self._image_url = None
+    self._image_resolved = False
+
+  @cached_property
+  def description(self) -> str:
+    return SteamFormatter.clean_content(self.item.get('contents'))
+
+  async def image_url(self) -> Optional[str]:
+    if not self._image_resolved:
+      self._image_url = await SteamFormatter.extract_image(self.item.get('contents'))
+      self._image_resolved = True
+    return self._image_url
+
+  async def to_dict(self) -> dict:
+    return {
+      'title': self.title,
+      'description': self.description,
+      'steam_id': self.steam_id,
+      'url': self.url,
+      'published_date': self.published_date,
+      'image_url': await self.image_url()
+    }
+
 class NewsService():
   def __init__(self, db: Database):
     self.db = db
 
-  async def get_news_by_steam_id(self, steam_id, format='full'):
-    news_for_game = await steam.get_game_news(steam_id)
+  async def get_news(self, steam_id, only_changed=False) -> Optional[SteamNews]:
+    with NEWS_FETCH_SECONDS.time():
+      news_for_game = await steam.get_game_news(steam_id, only_changed=only_changed)
     
     if not news_for_game or 'gid' not in news_for_game:
+      NEWS_FETCHED.inc(result='unchanged')
       return None
 
-    if format == 'id':
-      return {'steam_id': news_for_game.get('gid')}
-    
-    return {
-      'title': news_for_game.get('title'),
-      'description': SteamFormatter.clean_content(news_for_game.get('contents')),
-      'steam_id': news_for_game.get('gid'),
-      'url': news_for_game.get('url'),
-      'published_date': SteamFormatter.clean_date(news_for_game.get('date')),
-      'image_url': SteamFormatter.extract_image(news_for_game.get('contents'))
-    }
+    NEWS_FETCHED.inc(result='changed')
+    return SteamNews(news_for_game)
+
+  async def render_many(self, news: list[SteamNews]) -> None:
+    with NEWS_RENDER_SECONDS.time():
+      descriptions = await formatting_executor.map(SteamFormatter.clean_content, [item.item.get('contents') for item in news])
+      for item, description in zip(news, descriptions):
+        item.description = description
+      await asyncio.gather(*(item.image_url() for item in news))
+    NEWS_RENDERED.inc(len(news))
@@ -0,0 +1,128 @@
+import heapq
+import math
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Iterable, Optional
+
+HISTORY_SIZE = 8
+ACTIVITY_DIVISOR = 48
+DORMANCY_DIVISOR = 10
+
+class PollTarget:
+  def __init__(self, steam_id: str, followers: int = 1) -> None:
+    self.steam_id: str = steam_id
+    self.followers: int = max(followers, 1)
+    self.published: deque = deque(maxlen=HISTORY_SIZE)
+    self.next_poll: float = 0.0
+
+  def observe(self, published_date: datetime) -> bool:
+    timestamp = published_date.timestamp()
+    if self.published and timestamp <= self.published[-1]:
+      return False
+    self.published.append(timestamp)
+    return True
+
+class PollScheduler:
+  def __init__(
+    self,
+    min_interval: float = 300.0,
+    max_interval: float = 21600.0,
+    budget_per_minute: float = 60.0,
+    jitter: float = 0.1,
+    rng: Optional[random.Random] = None
+  ) -> None:
+    self.min_interval: float = min_interval
+    self.max_interval: float = max(max_interval, min_interval)
+    self.budget_per_minute: float = max(budget_per_minute, 1.0)
+    self.jitter: float = jitter
+    self.rng: random.Random = rng or random.Random()
+    self.targets: dict[str, PollTarget] = {}
+    self.polls: int = 0
+    self.throttled: int = 0
+    self._heap: list[tuple[float, str]] = []
+    self._allowance: float = self.budget_per_minute
+    self._allowance_at: Optional[float] = None
+
+  def sync(self, targets: Iterable[tuple[str, int, Optional[datetime]]], now: Optional[float] = None) -> None:
+    now = time.time() if now is None else now
+    seen = set()
+    for steam_id, followers, published_date in targets:
+      steam_id = str(steam_id)
+      seen.add(steam_id)
+      target = self.targets.get(steam_id)
+      if target is None:
+        target = self.targets[steam_id] = PollTarget(steam_id, followers)
+        if published_date:
+          target.observe(published_date)
+        self._schedule(target, now + self.rng.uniform(0, self.interval(target, now)))
+        continue
+      target.followers = max(followers, 1)
+      if published_date:
+        target.observe(published_date)
+    for steam_id in set(self.targets) - seen:
+      del self.targets[steam_id]
+
+  def due(self, now: Optional[float] = None) -> list[str]:
+    now = time.time() if now is None else now
+    self._refill(now)
+    steam_ids = []
+    while self._heap and self._heap[0][0] <= now:
+      next_poll, steam_id = self._heap[0]
+      target = self.targets.get(steam_id)
+      if target is None or target.next_poll != next_poll:
+        heapq.heappop(self._heap)
+        continue
+      if self._allowance < 1:
+        self.throttled += 1
+        break
+      heapq.heappop(self._heap)
+      self._allowance -= 1
+      steam_ids.append(steam_id)
+    self.polls += len(steam_ids)
+    return steam_ids
+
+  def observe(self, steam_id: str, published_date: datetime) -> None:
+    target = self.targets.get(str(steam_id))
+    if target:
+      target.observe(published_date)
+
+  def reschedule(self, steam_ids: Iterable[str], now: Optional[float] = None) -> None:
+    now = time.time() if now is None else now
+    for steam_id in steam_ids:
+      target = self.targets.get(str(steam_id))
+      if target:
+        self._schedule(target, now + self.interval(target, now))
+
+  def interval(self, target: PollTarget, now: float) -> float:
+    published = target.published
+    if len(published) >= 2:
+      base = (published[-1] - published[0]) / (len(published) - 1) / ACTIVITY_DIVISOR
+    elif published:
+      base = max(now - published[-1], 0.0) / DORMANCY_DIVISOR
+    else:
+      base = self.max_interval
+    base /= 1 + math.log10(target.followers)
+    base = min(max(base, self.min_interval), self.max_interval)
+    return base * self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+  def stats(self) -> dict:
+    now = time.time()
+    intervals = sorted(self.interval(target, now) for target in self.targets.values())
+    return {
+      'targets': len(self.targets),
+      'polls': self.polls,
+      'throttled': self.throttled,
+      'median_interval': intervals[len(intervals) // 2] if intervals else 0.0
+    }
+
+  def _schedule(self, target: PollTarget, next_poll: float) -> None:
+    target.next_poll = next_poll
+    heapq.heappush(self._heap, (next_poll, target.steam_id))
+
+  def _refill(self, now: float) -> None:
+    if self._allowance_at is not None:
+      elapsed = max(now - self._allowance_at, 0.0)
+      self._allowance = min(self.budget_per_minute, self._allowance + elapsed * self.budget_per_minute / 60)
+    self._allowance_at = now
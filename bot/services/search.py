@@ -0,0 +1,78 @@
+from typing import Optional
+from discord import app_commands
+from models import queries
+from utils.cache import LRUCache, TTLCache
+from utils.catalog import AppCatalog
+from utils.database import Database, database
+from utils.matching import Matcher
+from utils.steamer import Steam, steam
+
+MAX_CHOICES = 25
+MAX_CHOICE_NAME_LENGTH = 100
+
+class GameSearchService():
+  def __init__(self, db: Database, steam: Steam, cache_size: int = 4096, followed_ttl: float = 60.0):
+    self.db = db
+    self.steam = steam
+    self.catalog_results = LRUCache(cache_size)
+    self.followed_games = TTLCache(cache_size, ttl=followed_ttl)
+    self._catalog: Optional[AppCatalog] = None
+
+  async def complete_catalog(self, current: str) -> list[app_commands.Choice[str]]:
+    return self._choices(self._search_catalog(current))
+
+  async def complete_followed(self, guild_id: int, current: str) -> list[app_commands.Choice[str]]:
+    normalized_current = Matcher.normalize_text(current)
+    games = [
+      (name, steam_id)
+      for normalized_name, name, steam_id in await self._get_followed_games(guild_id)
+      if normalized_current in normalized_name
+    ]
+    if len(games) < MAX_CHOICES:
+      followed_ids = {steam_id for _, steam_id in games}
+      games += [game for game in self._search_catalog(current) if game[1] not in followed_ids]
+    return self._choices(games)
+
+  def invalidate_followed(self, guild_id: int) -> None:
+    self.followed_games.pop(guild_id)
+
+  def _search_catalog(self, current: str) -> list[tuple[str, str]]:
+    catalog = self.steam.app_catalog
+    if not catalog:
+      return []
+    if catalog is not self._catalog:
+      self.catalog_results.clear()
+      self._catalog = catalog
+
+    normalized_current = Matcher.normalize_text(current)
+    if not normalized_current:
+      return []
+    games = self.catalog_results.get(normalized_current)
+    if games is None:
+      positions = catalog.prefix_index.search(normalized_current, limit=MAX_CHOICES)
+      if len(positions) < MAX_CHOICES:
+        seen = set(positions)
+        for position, _ in catalog.index.search(normalized_current, limit=MAX_CHOICES * 2):
+          if position not in seen:
+            positions.append(position)
+            seen.add(position)
+      games = [(catalog.names[position], str(catalog.app_ids[position])) for position in positions[:MAX_CHOICES]]
+      self.catalog_results.set(normalized_current, games)
+    return games
+
+  async def _get_followed_games(self, guild_id: int) -> list[tuple[str, str, str]]:
+    games = self.followed_games.get(guild_id)
+    if games is None:
+      rows = (await self.db.execute(queries.followed_game_names_for_guild(str(guild_id)))).all()
+      games = [(Matcher.normalize_text(name), name, steam_id) for name, steam_id in rows]
+      self.followed_games.set(guild_id, games)
+    return games
+
+  @staticmethod
+  def _choices(games: list[tuple[str, str]]) -> list[app_commands.Choice[str]]:
+    return [
+      app_commands.Choice(name=f"{name} ({steam_id})"[:MAX_CHOICE_NAME_LENGTH], value=steam_id)
+      for name, steam_id in games[:MAX_CHOICES]
+    ]
+
+game_search = GameSearchService(database, steam)
@@ -1,4 +1,5 @@
 import os
+import socket
 from typing import Optional
 from dotenv import load_dotenv
 
@@ -8,12 +9,73 @@ class Config:
 
     self.discord_token: str = self._get_env_var('DISCORD_TOKEN')
     self.db_path: str = self._get_env_var('DB_PATH')
+    self.db_profile: str = self._get_env_var('DB_PROFILE', 'default')
+    self.db_read_pool_size: int = self._get_int_env_var('DB_READ_POOL_SIZE', 4)
+    self.db_profiling: bool = self._get_env_var('DB_PROFILING', 'off') == 'on'
+    self.db_slow_query_ms: int = self._get_int_env_var('DB_SLOW_QUERY_MS', 100)
     self.log_file: Optional[str] = self._get_env_var('LOG_FILE')
+    self.log_max_bytes: int = self._get_int_env_var('LOG_MAX_BYTES', 10485760)
+    self.log_backup_count: int = self._get_int_env_var('LOG_BACKUP_COUNT', 5)
     self.locales_path: str = self._get_env_var('LOCALES_PATH', 'locales')
     self.default_locale: str = self._get_env_var('DEFAULT_LOCALE', 'en')
     self.discord_owner_id: str = self._get_env_var('DISCORD_OWNER_ID')
+    self.gateway_profile: str = self._get_env_var('GATEWAY_PROFILE', 'default')
+    self.sync_commands: str = self._get_env_var('SYNC_COMMANDS', 'auto')
+    self.sharding: bool = self._get_env_var('SHARDING', 'off') == 'auto'
+    self.shard_count: int = self._get_int_env_var('SHARD_COUNT', 0)
+    self.shard_ids: Optional[list[int]] = self._get_int_list_env_var('SHARD_IDS')
+    self.worker_id: str = self._get_env_var('WORKER_ID', f"{socket.gethostname()}-{os.getpid()}")
+    self.poll_partitions: int = self._get_int_env_var('POLL_PARTITIONS', 64)
+    self.lease_ttl_seconds: int = self._get_int_env_var('LEASE_TTL_SECONDS', 90)
+    self.delivery_sweep_seconds: int = self._get_int_env_var('DELIVERY_SWEEP_SECONDS', 60)
+    self.delivery_max_attempts: int = self._get_int_env_var('DELIVERY_MAX_ATTEMPTS', 5)
+    self.data_path: str = self._get_env_var('DATA_PATH', 'data')
+    self.poll_tick_seconds: int = self._get_int_env_var('POLL_TICK_SECONDS', 30)
+    self.poll_sync_seconds: int = self._get_int_env_var('POLL_SYNC_SECONDS', 300)
+    self.poll_min_interval: int = self._get_int_env_var('POLL_MIN_INTERVAL', 300)
+    self.poll_max_interval: int = self._get_int_env_var('POLL_MAX_INTERVAL', 21600)
+    self.poll_budget_per_minute: int = self._get_int_env_var('POLL_BUDGET_PER_MINUTE', 60)
+    self.news_queue_size: int = self._get_int_env_var('NEWS_QUEUE_SIZE', 100)
+    self.news_fetch_workers: int = self._get_int_env_var('NEWS_FETCH_WORKERS', 16)
+    self.news_format_workers: int = self._get_int_env_var('NEWS_FORMAT_WORKERS', 4)
+    self.news_persist_workers: int = self._get_int_env_var('NEWS_PERSIST_WORKERS', 1)
+    self.news_persist_batch_size: int = self._get_int_env_var('NEWS_PERSIST_BATCH_SIZE', 500)
+    self.news_persist_batch_wait_ms: int = self._get_int_env_var('NEWS_PERSIST_BATCH_WAIT_MS', 1000)
+    self.news_deliver_workers: int = self._get_int_env_var('NEWS_DELIVER_WORKERS', 8)
+    self.news_format_batch_size: int = self._get_int_env_var('NEWS_FORMAT_BATCH_SIZE', 32)
+    self.news_format_batch_wait_ms: int = self._get_int_env_var('NEWS_FORMAT_BATCH_WAIT_MS', 200)
+    self.delivery_global_rate: int = self._get_int_env_var('DELIVERY_GLOBAL_RATE', 50)
+    self.delivery_channel_burst: int = self._get_int_env_var('DELIVERY_CHANNEL_BURST', 5)
+    self.delivery_channel_period: int = self._get_int_env_var('DELIVERY_CHANNEL_PERIOD', 5)
+    self.delivery_workers: int = self._get_int_env_var('DELIVERY_WORKERS', 50)
+    self.format_executor: str = self._get_env_var('FORMAT_EXECUTOR', 'inline')
+    self.format_workers: int = self._get_int_env_var('FORMAT_WORKERS', 0)
+    self.steam_api_url: str = self._get_env_var('STEAM_API_URL', 'http://api.steampowered.com')
+    self.steam_store_url: str = self._get_env_var('STEAM_STORE_URL', 'http://store.steampowered.com')
+    self.steam_pool_limit: int = self._get_int_env_var('STEAM_POOL_LIMIT', 100)
+    self.steam_pool_limit_per_host: int = self._get_int_env_var('STEAM_POOL_LIMIT_PER_HOST', 20)
+    self.steam_dns_cache_ttl: int = self._get_int_env_var('STEAM_DNS_CACHE_TTL', 300)
+    self.steam_connect_timeout: int = self._get_int_env_var('STEAM_CONNECT_TIMEOUT', 5)
+    self.steam_timeout: int = self._get_int_env_var('STEAM_TIMEOUT', 15)
+    self.steam_cache_size: int = self._get_int_env_var('STEAM_CACHE_SIZE', 5000)
+    self.steam_app_list_ttl: int = self._get_int_env_var('STEAM_APP_LIST_TTL', 86400)
+    self.image_cache_size: int = self._get_int_env_var('IMAGE_CACHE_SIZE', 10000)
+    self.image_probe_bytes: int = self._get_int_env_var('IMAGE_PROBE_BYTES', 65536)
+    self.image_probe_concurrency: int = self._get_int_env_var('IMAGE_PROBE_CONCURRENCY', 8)
+    self.identity_cache_size: int = self._get_int_env_var('IDENTITY_CACHE_SIZE', 10000)
+    self.identity_cache_ttl: int = self._get_int_env_var('IDENTITY_CACHE_TTL', 3600)
+    self.metrics_host: str = self._get_env_var('METRICS_HOST', '127.0.0.1')
+    self.metrics_port: int = self._get_int_env_var('METRICS_PORT', 0)
 
   def _get_env_var(self, var_name: str, default: Optional[str] = None) -> Optional[str]:
     return os.getenv(var_name, default)
 
+  def _get_int_env_var(self, var_name: str, default: int) -> int:
+    value = os.getenv(var_name)
+    return int(value) if value else default
+
+  def _get_int_list_env_var(self, var_name: str) -> Optional[list[int]]:
+    value = os.getenv(var_name)
+    return [int(item) for item in value.split(',') if item.strip()] if value else None
+
 config = Config()
@@ -4,3 +4,4 @@ from models.news import News
 from models.server import Server
 from models.subscription import Subscription
 from models.user import User
+from models.worker import PartitionLease, Worker
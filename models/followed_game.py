@@ -1,11 +1,16 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from utils.database import BaseModel
 
 class FollowedGame(BaseModel):
   __tablename__ = 'followed_games'
+  __table_args__ = (
+    Index('ix_followed_games_game_server', 'game_id', 'server_id', unique=True),
+    Index('ix_followed_games_server_id', 'server_id')
+  )
   id = Column(Integer, primary_key=True, autoincrement=True)
   discord_channel_id = Column(String, nullable=False)
+  last_news_steam_id = Column(String, nullable=True)
 
   server_id = Column(Integer, ForeignKey('servers.id'), nullable=False)
   game_id = Column(Integer, ForeignKey('games.id'), nullable=False)
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship, backref
 from utils.database import BaseModel
 
 class News(BaseModel):
   __tablename__ = 'news'
+  __table_args__ = (Index('ix_news_game_id', 'game_id', unique=True),)
   id = Column(Integer, primary_key=True, autoincrement=True)
   title = Column(String, nullable=False)
   description = Column(String, nullable=True)
@@ -0,0 +1,76 @@
+from typing import Iterable
+from sqlalchemy import func, or_
+from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql import Select
+from models.followed_game import FollowedGame
+from models.game import Game
+from models.news import News
+from models.server import Server
+
+def server_by_discord_id(discord_id: str) -> Select:
+  return select(Server).where(Server.discord_id == discord_id)
+
+def servers_by_discord_ids(discord_ids: Iterable[str]) -> Select:
+  return select(Server).where(Server.discord_id.in_(list(discord_ids)))
+
+def game_by_steam_id(steam_id: str) -> Select:
+  return select(Game).options(joinedload(Game.news)).where(Game.steam_id == steam_id)
+
+def games_followed_by_servers(server_ids: Iterable[int]) -> Select:
+  return (
+    select(Game)
+    .options(joinedload(Game.news))
+    .join(FollowedGame, FollowedGame.game_id == Game.id)
+    .where(FollowedGame.server_id.in_(list(server_ids)))
+    .distinct()
+  )
+
+def followed_game(game_id: int, server_id: int) -> Select:
+  return select(FollowedGame).where(FollowedGame.game_id == game_id, FollowedGame.server_id == server_id)
+
+def followed_game_with_news(game_id: int, server_id: int) -> Select:
+  return (
+    select(FollowedGame, News)
+    .outerjoin(News, News.game_id == FollowedGame.game_id)
+    .where(FollowedGame.game_id == game_id, FollowedGame.server_id == server_id)
+  )
+
+def followed_games_for_server(server_id: int) -> Select:
+  return select(FollowedGame).options(joinedload(FollowedGame.game)).where(FollowedGame.server_id == server_id)
+
+def followed_game_names_for_guild(discord_id: str) -> Select:
+  return (
+    select(Game.name, Game.steam_id)
+    .join(FollowedGame, FollowedGame.game_id == Game.id)
+    .join(Server, FollowedGame.server_id == Server.id)
+    .where(Server.discord_id == discord_id)
+    .order_by(Game.name)
+  )
+
+def followed_games_for_steam_ids(steam_ids: Iterable[str]) -> Select:
+  return all_followed_games().where(
+    FollowedGame.game_id.in_(select(Game.id).where(Game.steam_id.in_(list(steam_ids))))
+  )
+
+def poll_targets() -> Select:
+  return (
+    select(Game.steam_id, func.count(FollowedGame.id), News.published_date)
+    .join(FollowedGame, FollowedGame.game_id == Game.id)
+    .outerjoin(News, News.game_id == Game.id)
+    .group_by(Game.id)
+  )
+
+def pending_deliveries() -> Select:
+  return (
+    select(FollowedGame, News)
+    .join(News, News.game_id == FollowedGame.game_id)
+    .options(joinedload(FollowedGame.game), joinedload(FollowedGame.server))
+    .where(or_(FollowedGame.last_news_steam_id.is_(None), FollowedGame.last_news_steam_id != News.steam_id))
+  )
+
+def all_followed_games() -> Select:
+  return select(FollowedGame).options(
+    joinedload(FollowedGame.game).joinedload(Game.news),
+    joinedload(FollowedGame.server)
+  )
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Float, Integer, String
+from utils.database import BaseModel
+
+class Worker(BaseModel):
+  __tablename__ = 'workers'
+  worker_id = Column(String, primary_key=True)
+  expires_at = Column(Float, nullable=False)
+
+class PartitionLease(BaseModel):
+  __tablename__ = 'partition_leases'
+  partition = Column(Integer, primary_key=True, autoincrement=False)
+  worker_id = Column(String, nullable=False)
+  expires_at = Column(Float, nullable=False)
@@ -0,0 +1,43 @@
+import argparse
+import os
+import signal
+import subprocess
+import sys
+from utils.logging import logger
+
+log = logger.get_logger(__name__)
+
+def worker_env(worker: int, workers: int, shards: int) -> dict[str, str]:
+  env = dict(os.environ)
+  env['SHARDING'] = 'auto'
+  env['SHARD_COUNT'] = str(shards)
+  env['SHARD_IDS'] = ','.join(str(shard) for shard in range(worker, shards, workers))
+  env['WORKER_ID'] = f"worker-{worker}"
+  if env.get('METRICS_PORT') and int(env['METRICS_PORT']):
+    env['METRICS_PORT'] = str(int(env['METRICS_PORT']) + worker)
+  if env.get('LOG_FILE'):
+    root, ext = os.path.splitext(env['LOG_FILE'])
+    env['LOG_FILE'] = f"{root}.worker-{worker}{ext}"
+  return env
+
+def main(workers: int, shards: int) -> None:
+  processes = []
+  for worker in range(workers):
+    env = worker_env(worker, workers, shards)
+    log.info(f"Starting {env['WORKER_ID']} with shard(s) {env['SHARD_IDS']}/{shards}")
+    processes.append(subprocess.Popen([sys.executable, 'run_bot.py'], env=env))
+  try:
+    for process in processes:
+      process.wait()
+  except KeyboardInterrupt:
+    for process in processes:
+      process.send_signal(signal.SIGINT)
+    for process in processes:
+      process.wait()
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Run several NoxBot worker processes sharing the gateway shards and the Steam polling.')
+  parser.add_argument('--workers', type=int, default=2)
+  parser.add_argument('--shards', type=int, default=0, help='total shard count, defaults to one shard per worker')
+  args = parser.parse_args()
+  main(args.workers, max(args.shards, args.workers))
@@ -0,0 +1,152 @@
+import re
+from typing import Callable, Union
+
+Replacement = Union[str, Callable[[re.Match], str]]
+
+LIST_OPEN = re.compile(r'(?<!\n)\[list\]')
+LIST_CLOSE = re.compile(r'(?<!\n)\[/list\]')
+LIST_ITEM = re.compile(r'(?<!\n)\[\*\]\s*')
+URL = re.compile(r'https?://[^\s\]\)\}]+')
+BLANK_LINES = re.compile(r'\n{3,}')
+
+class BBCodeEngine:
+  def __init__(self, rules: dict[str, Replacement], window: int = 2048, line_margin: int = 6) -> None:
+    self.rules: list[tuple[re.Pattern, Replacement]] = [
+      (re.compile(pattern, re.MULTILINE), repl) for pattern, repl in rules.items()
+    ]
+    self.window: int = window
+    self.line_margin: int = line_margin
+
+  def render(self, content: str, max_length: int = 500, max_lines: int = 12) -> str:
+    window = max(self.window, max_length * 4)
+    while True:
+      chunk, complete = self._take(content, window)
+      text = self._render_markup(chunk)
+      if complete or self._fills_budget(text, max_length, max_lines):
+        break
+      window *= 4
+    return self._final_filter(self._limit(text, max_chars=max_length, max_lines=max_lines))
+
+  def _render_markup(self, text: str) -> str:
+    return self._remove_duplicate_urls(self._apply_rules(self._format_list_block(text)))
+
+  @staticmethod
+  def _take(content: str, window: int) -> tuple[str, bool]:
+    if len(content) <= window:
+      return content, True
+    end = content.find('\n', window)
+    if end == -1:
+      return content, True
+    return content[:end], False
+
+  def _fills_budget(self, text: str, max_length: int, max_lines: int) -> bool:
+    lines = text.split('\n')
+    stable = lines[:len(lines) - self.line_margin]
+    if len(stable) > max_lines:
+      return True
+    return sum(len(line) + 1 for line in stable[:-1]) >= max_length
+
+  def _apply_rules(self, text: str) -> str:
+    for pattern, repl in self.rules:
+      text = pattern.sub(repl, text)
+    return text.strip()
+
+  @staticmethod
+  def _limit(text: str, max_chars: int, max_lines: int) -> str:
+    lines = text.splitlines()
+    out, total = [], 0
+    for idx, line in enumerate(lines):
+      if idx >= max_lines or total >= max_chars:
+        break
+      remaining = max_chars - total
+      if len(line) + 1 <= remaining:
+        out.append(line)
+        total += len(line) + 1
+      else:
+        out.append(line[:remaining].rstrip() + '..')
+        total = max_chars
+        break
+    result = "\n".join(out).rstrip()
+    if len(out) < len(lines) or total < len(text):
+      result += "\n..."
+    return result
+  
+  @staticmethod
+  def _final_filter(content: str) -> str:
+    lines = content.splitlines()
+    filtered = []
+    i = 0
+    while i < len(lines):
+      raw = lines[i]
+      indent = raw[: len(raw) - len(raw.lstrip('\u00A0 '))]
+      stripped = raw.strip()
+      if stripped.startswith('**') and stripped.endswith('**') and stripped.count('**') == 2:
+        filtered.append(stripped)
+        i += 1
+        continue
+      if stripped.startswith('**') and stripped.endswith('**'):
+        next_stripped = lines[i + 1].strip() if i + 1 < len(lines) else '' 
+        if not next_stripped.startswith('•'): 
+          i += 1 
+          continue
+      if 'http' in stripped and stripped.endswith('..'):
+        parts = stripped.split()
+        if parts and parts[-1].startswith('http') and parts[-1].endswith('..'):
+          prefix = ' '.join(parts[:-1]).rstrip(' :;,')
+          stripped = prefix + '..'
+      filtered.append(indent + stripped)
+      i += 1
+    final_lines = []
+    for ln in filtered:
+      if ln == '...':
+        while final_lines and final_lines[-1] == '':
+          final_lines.pop()
+        final_lines.append(ln)
+      else:
+        final_lines.append(ln)
+    while final_lines and final_lines[-1] == '':
+      final_lines.pop()
+    return '\n'.join(final_lines)
+
+  @staticmethod
+  def _format_list_block(text: str) -> str:
+    text = LIST_OPEN.sub('\n[list]', text)
+    text = LIST_CLOSE.sub('\n[/list]', text)
+    text = LIST_ITEM.sub('\n[*] ', text)
+    lines = text.splitlines()
+    formatted = []
+    depth = 0
+    for raw in lines:
+      stripped = raw.strip()
+      if not stripped:
+        formatted.append(raw)
+        continue
+      if stripped == "[list]":
+        depth += 1
+      elif stripped == "[/list]":
+        depth = max(depth - 1, 0)
+      elif stripped.startswith("[*]"):
+        content = stripped[3:].strip()
+        bullet = '\u00A0' * ((depth - 1) * 4) + ('•' if depth <= 1 else '◦')
+        formatted.append(f"{bullet} {content}")
+      else:
+        formatted.append(raw)
+        depth = 0
+    return "\n".join(formatted).strip()
+    
+  @staticmethod
+  def _remove_duplicate_urls(text: str) -> str:
+    urls_seen = set()
+    output = []
+    for line in text.splitlines():
+      urls_in_line = URL.findall(line)
+      keep_line = line
+      for url in urls_in_line:
+        if url in urls_seen:
+          keep_line = keep_line.replace(url, '')
+        else:
+          urls_seen.add(url)
+      output.append(keep_line.rstrip())
+    cleaned_text = '\n'.join(output)
+    cleaned_text = BLANK_LINES.sub('\n\n', cleaned_text)
+    return cleaned_text.strip()
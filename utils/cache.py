@@ -0,0 +1,86 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class LRUCache:
+  def __init__(self, maxsize: int = 1024) -> None:
+    self.maxsize: int = max(maxsize, 1)
+    self.hits: int = 0
+    self.misses: int = 0
+    self.evictions: int = 0
+    self._data: OrderedDict = OrderedDict()
+
+  def get(self, key: Hashable, default: Optional[Any] = None) -> Optional[Any]:
+    if key not in self._data:
+      self.misses += 1
+      return default
+    self.hits += 1
+    self._data.move_to_end(key)
+    return self._data[key]
+
+  def set(self, key: Hashable, value: Any) -> None:
+    self._data[key] = value
+    self._data.move_to_end(key)
+    while len(self._data) > self.maxsize:
+      self._data.popitem(last=False)
+      self.evictions += 1
+
+  def pop(self, key: Hashable, default: Optional[Any] = None) -> Optional[Any]:
+    return self._data.pop(key, default)
+
+  def items(self) -> list[tuple[Hashable, Any]]:
+    return list(self._data.items())
+
+  def clear(self) -> None:
+    self._data.clear()
+
+  def stats(self) -> dict:
+    lookups = self.hits + self.misses
+    return {
+      'size': len(self._data),
+      'maxsize': self.maxsize,
+      'hits': self.hits,
+      'misses': self.misses,
+      'evictions': self.evictions,
+      'hit_rate': self.hits / lookups if lookups else 0.0
+    }
+
+  def __contains__(self, key: Hashable) -> bool:
+    return key in self._data
+
+  def __len__(self) -> int:
+    return len(self._data)
+
+class TTLCache(LRUCache):
+  def __init__(self, maxsize: int = 1024, ttl: float = 60.0) -> None:
+    super().__init__(maxsize)
+    self.ttl: float = ttl
+    self.expirations: int = 0
+
+  def get(self, key: Hashable, default: Optional[Any] = None) -> Optional[Any]:
+    entry: Optional[tuple[float, Any]] = super().get(key)
+    if entry is None:
+      return default
+    expires_at, value = entry
+    if expires_at <= time.monotonic():
+      self._data.pop(key, None)
+      self.hits -= 1
+      self.misses += 1
+      self.expirations += 1
+      return default
+    return value
+
+  def set(self, key: Hashable, value: Any) -> None:
+    super().set(key, (time.monotonic() + self.ttl, value))
+
+  def pop(self, key: Hashable, default: Optional[Any] = None) -> Optional[Any]:
+    entry: Optional[tuple[float, Any]] = super().pop(key)
+    return entry[1] if entry else default
+
+  def items(self) -> list[tuple[Hashable, Any]]:
+    return [(key, value) for key, (_, value) in super().items()]
+
+  def stats(self) -> dict:
+    stats = super().stats()
+    stats['expirations'] = self.expirations
+    return stats
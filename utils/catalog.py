@@ -0,0 +1,134 @@
+import mmap
+import os
+import struct
+from array import array
+from typing import Iterable, Optional, Sequence
+from utils.matching import PrefixIndex, SearchIndex
+
+MAGIC = b'NXAPPS\x00\x02'
+HEADER = struct.Struct('<8s7I')
+
+class StringTable(Sequence):
+  def __init__(self, offsets: Sequence[int], blob: Sequence[int]) -> None:
+    self.offsets: Sequence[int] = offsets
+    self.blob = blob
+
+  @classmethod
+  def pack(cls, strings: Iterable[str]) -> 'StringTable':
+    offsets: array = array('I', [0])
+    chunks: list[bytes] = []
+    size = 0
+    for string in strings:
+      encoded = string.encode('utf-8')
+      chunks.append(encoded)
+      size += len(encoded)
+      offsets.append(size)
+    return cls(offsets, b''.join(chunks))
+
+  def __getitem__(self, position: int) -> str:
+    return bytes(self.blob[self.offsets[position]:self.offsets[position + 1]]).decode('utf-8')
+
+  def __len__(self) -> int:
+    return len(self.offsets) - 1
+
+class AppCatalog:
+  def __init__(
+    self,
+    app_ids: Sequence[int],
+    names: StringTable,
+    index: SearchIndex,
+    prefix_index: PrefixIndex,
+    buffer: Optional[mmap.mmap] = None
+  ) -> None:
+    self.app_ids: Sequence[int] = app_ids
+    self.names: StringTable = names
+    self.index: SearchIndex = index
+    self.prefix_index: PrefixIndex = prefix_index
+    self.buffer: Optional[mmap.mmap] = buffer
+
+  @classmethod
+  def build(cls, apps: list[dict]) -> 'AppCatalog':
+    names: StringTable = StringTable.pack(app.get('name', '') for app in apps)
+    index: SearchIndex = SearchIndex.build(names)
+    index.names = StringTable.pack(index.names)
+    prefix_index: PrefixIndex = PrefixIndex.build(index.names)
+    return cls(array('I', (app.get('appid', 0) for app in apps)), names, index, prefix_index)
+
+  @classmethod
+  def load(cls, path: str) -> Optional['AppCatalog']:
+    if not os.path.exists(path):
+      return None
+    try:
+      with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+      magic, apps, names_size, normalized_size, keys, postings, short_ids, _ = HEADER.unpack_from(buffer, 0)
+    except (OSError, ValueError, struct.error):
+      return None
+    if magic != MAGIC:
+      return None
+
+    view = memoryview(buffer)
+    position = HEADER.size
+    def take(count: int, fmt: Optional[str] = 'I') -> memoryview:
+      nonlocal position
+      size = count * 4 if fmt else count
+      section = view[position:position + size]
+      position += size
+      return section.cast(fmt) if fmt else section
+
+    try:
+      app_ids = take(apps)
+      name_offsets = take(apps + 1)
+      normalized_offsets = take(apps + 1)
+      index_keys = take(keys)
+      index_offsets = take(keys + 1)
+      index_postings = take(postings)
+      index_short_ids = take(short_ids)
+      prefix_order = take(apps)
+      names_blob = take(names_size, None)
+      normalized_blob = take(normalized_size, None)
+    except (TypeError, ValueError, IndexError):
+      return None
+    if position > len(buffer):
+      return None
+    normalized_names = StringTable(normalized_offsets, normalized_blob)
+    index = SearchIndex(normalized_names, index_keys, index_offsets, index_postings, index_short_ids)
+    prefix_index = PrefixIndex(normalized_names, prefix_order)
+    return cls(app_ids, StringTable(name_offsets, names_blob), index, prefix_index, buffer)
+
+  def save(self, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as file:
+      file.write(HEADER.pack(
+        MAGIC,
+        len(self),
+        len(self.names.blob),
+        len(self.index.names.blob),
+        len(self.index.keys),
+        len(self.index.postings),
+        len(self.index.short_ids),
+        0
+      ))
+      for section in (
+        self.app_ids,
+        self.names.offsets,
+        self.index.names.offsets,
+        self.index.keys,
+        self.index.offsets,
+        self.index.postings,
+        self.index.short_ids,
+        self.prefix_index.order
+      ):
+        file.write(array('I', section).tobytes())
+      file.write(bytes(self.names.blob))
+      file.write(bytes(self.index.names.blob))
+      file.flush()
+      os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+  def app(self, position: int) -> dict:
+    return {'appid': self.app_ids[position], 'name': self.names[position]}
+
+  def __len__(self) -> int:
+    return len(self.app_ids)
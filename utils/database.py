@@ -1,56 +1,390 @@
-from typing import Any, Union
+import contextvars
+import json
+import os
+import re
+import sys
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Union
+from sqlalchemy import event, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.ext.asyncio import AsyncSession, AsyncEngine, create_async_engine
 from sqlalchemy.engine import Result
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql import Select
 from config import config
+from utils.logging import logger
+from utils.metrics import metrics
+from utils.migrations import migrate
+
+log = logger.get_logger(__name__)
 
 Base = declarative_base()
 
+DB_OPERATION_SECONDS = metrics.histogram('db_operation_seconds', 'Database round trip latency by operation')
+DB_UPSERTED_ROWS = metrics.counter('db_upserted_rows_total', 'Rows written through batched upserts')
+
+PROFILES = {
+  'default': {},
+  'production': {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -65536,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000
+  }
+}
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+
+CALL_SITE: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('call_site', default=None)
+
+def _caller() -> str:
+  frame = sys._getframe(1)
+  while frame:
+    filename = frame.f_code.co_filename
+    if filename != __file__ and 'contextlib' not in filename and filename.startswith(ROOT_PATH):
+      return f"{os.path.relpath(filename, ROOT_PATH)}:{frame.f_lineno} {frame.f_code.co_name}"
+    frame = frame.f_back
+  return 'unknown'
+
+class QueryStats:
+  def __init__(self, shape: str) -> None:
+    self.shape: str = shape
+    self.calls: int = 0
+    self.total: float = 0.0
+    self.max: float = 0.0
+    self.rows: int = 0
+    self.max_rows: int = 0
+    self.call_sites: dict[str, int] = {}
+
+  def record(self, elapsed: float, rows: int, call_site: str) -> None:
+    self.calls += 1
+    self.total += elapsed
+    self.max = max(self.max, elapsed)
+    self.rows += rows
+    self.max_rows = max(self.max_rows, rows)
+    self.call_sites[call_site] = self.call_sites.get(call_site, 0) + 1
+
+  def to_dict(self) -> dict:
+    return {
+      'shape': self.shape,
+      'calls': self.calls,
+      'total_ms': round(self.total * 1000, 3),
+      'mean_ms': round(self.total * 1000 / self.calls, 3) if self.calls else 0.0,
+      'max_ms': round(self.max * 1000, 3),
+      'rows': self.rows,
+      'max_rows': self.max_rows,
+      'call_sites': dict(sorted(self.call_sites.items(), key=lambda item: -item[1]))
+    }
+
+class QueryProfiler:
+  def __init__(self, slow_query_ms: float = 100.0, max_shapes: int = 1000) -> None:
+    self.slow_query: float = slow_query_ms / 1000
+    self.max_shapes: int = max(max_shapes, 1)
+    self.stats: dict[str, QueryStats] = {}
+    self.slow_queries: int = 0
+
+  def attach(self, engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, 'before_cursor_execute', self._before_cursor_execute)
+    event.listen(engine.sync_engine, 'after_cursor_execute', self._after_cursor_execute)
+
+  @staticmethod
+  def shape(statement: str) -> str:
+    statement = re.sub(r'\s+', ' ', statement).strip()
+    return re.sub(r'\(\?(?:, \?)+\)', '(?, ...)', statement)
+
+  def report(self, limit: int = 10, order_by: str = 'total') -> list[dict]:
+    ordered = sorted(self.stats.values(), key=lambda stats: getattr(stats, order_by), reverse=True)
+    return [stats.to_dict() for stats in ordered[:limit]]
+
+  def dump(self, path: str) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+      os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+      with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump({'slow_queries': self.slow_queries, 'statements': self.report(limit=len(self.stats))}, file, indent=2)
+      os.replace(tmp_path, path)
+    except OSError as e:
+      log.warning(f"Unable to save query statistics {path}: {e}")
+
+  def reset(self) -> None:
+    self.stats.clear()
+    self.slow_queries = 0
+
+  def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+      context._profiler_started = time.perf_counter()
+
+  def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+    started: Optional[float] = getattr(context, '_profiler_started', None)
+    if started is None:
+      return
+    elapsed = time.perf_counter() - started
+    rows = len(getattr(cursor, '_rows', ())) if cursor.description else max(cursor.rowcount, 0)
+    call_site = CALL_SITE.get() or 'unknown'
+    shape = self.shape(statement)
+    stats = self.stats.get(shape)
+    if stats is None:
+      if len(self.stats) >= self.max_shapes:
+        return
+      stats = self.stats[shape] = QueryStats(shape)
+    stats.record(elapsed, rows, call_site)
+    if elapsed >= self.slow_query:
+      self.slow_queries += 1
+      plan = self._explain(conn, statement, parameters[0] if executemany else parameters)
+      log.warning(
+        f"Slow query ({elapsed * 1000:.0f}ms, {rows} row(s)) from {call_site} : {shape}"
+        + ''.join(f"\n  {detail}" for detail in plan)
+      )
+
+  @staticmethod
+  def _explain(conn, statement: str, parameters: Any) -> list[str]:
+    if not statement.lstrip().upper().startswith(EXPLAINABLE):
+      return []
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+      cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+      return [row[-1] for row in cursor.fetchall()]
+    except Exception as e:
+      return [f"EXPLAIN QUERY PLAN failed: {e}"]
+    finally:
+      cursor.close()
+
 class BaseModel(Base):
   __abstract__ = True
   
   def to_dict(self):
     return {column.name: getattr(self, column.name) for column in self.__table__.columns}
 
+class UnitOfWork:
+  def __init__(self, database: 'Database') -> None:
+    self.database: 'Database' = database
+    self.session: Optional[AsyncSession] = None
+    self._after_commit: list[Callable[[], None]] = []
+
+  async def execute(self, query: Any, params: Optional[Any] = None) -> Result:
+    with self.database.call_site():
+      if self.session is None and self.database.immediate_transactions and isinstance(query, Select):
+        with DB_OPERATION_SECONDS.time(operation='read'):
+          async with self.database.ReadSession() as session:
+            return await session.execute(query, params)
+      session: AsyncSession = await self._begin()
+      with DB_OPERATION_SECONDS.time(operation='unit_of_work'):
+        return await session.execute(query, params)
+
+  async def add(self, entity: Any) -> Any:
+    with self.database.call_site():
+      session: AsyncSession = await self._begin()
+      session.add(entity)
+      await session.flush()
+    return entity
+
+  async def delete(self, entity: Any) -> None:
+    with self.database.call_site():
+      session: AsyncSession = await self._begin()
+      await session.delete(await session.merge(entity))
+      await session.flush()
+
+  async def get_or_create(self, model: Any, defaults: Optional[dict] = None, options: tuple = (), **lookup: Any) -> Any:
+    query = select(model).filter_by(**lookup).options(*options)
+    entity = (await self.execute(query)).scalar_one_or_none()
+    if entity:
+      return entity
+    await self.execute(
+      sqlite_insert(model).values(**lookup, **(defaults or {})).on_conflict_do_nothing(index_elements=list(lookup))
+    )
+    return (await self.execute(query)).scalar_one()
+
+  def after_commit(self, callback: Callable[[], None]) -> None:
+    self._after_commit.append(callback)
+
+  async def commit(self) -> None:
+    if self.session:
+      try:
+        with DB_OPERATION_SECONDS.time(operation='commit'):
+          await self.session.commit()
+      finally:
+        await self._close()
+    callbacks, self._after_commit = self._after_commit, []
+    for callback in callbacks:
+      callback()
+
+  async def rollback(self) -> None:
+    self._after_commit.clear()
+    if self.session:
+      try:
+        await self.session.rollback()
+      finally:
+        await self._close()
+
+  async def _begin(self) -> AsyncSession:
+    if self.session is None:
+      self.session = self.database.Session()
+      if self.database.immediate_transactions:
+        await self.session.execute(text('BEGIN IMMEDIATE'))
+    return self.session
+
+  async def _close(self) -> None:
+    session, self.session = self.session, None
+    await session.close()
+
 class Database:
-  def __init__(self, db_path: str = 'sqlite+aiosqlite:///:memory:') -> None:
+  def __init__(
+    self,
+    db_path: str = 'sqlite+aiosqlite:///:memory:',
+    profile: str = 'default',
+    read_pool_size: int = 4,
+    profiler: Optional[QueryProfiler] = None
+  ) -> None:
     self.db_path: str = db_path
+    self.profile: str = profile if profile in PROFILES else 'default'
+    self.pragmas: dict = PROFILES[self.profile]
+    self.read_pool_size: int = max(read_pool_size, 1)
+    self.immediate_transactions: bool = not self._is_memory()
     self.engine: AsyncEngine = self._create_engine()
-    self.Session: sessionmaker = self._create_session()
+    self.read_engine: AsyncEngine = self._create_read_engine()
+    self.Session: sessionmaker = self._create_session(self.engine)
+    self.ReadSession: sessionmaker = self._create_session(self.read_engine)
+    self.profiler: Optional[QueryProfiler] = profiler
+    if self.profiler:
+      self.profiler.attach(self.engine)
+      if self.read_engine is not self.engine:
+        self.profiler.attach(self.read_engine)
 
   async def setup(self) -> None:
     async with self.engine.begin() as conn:
       await conn.run_sync(Base.metadata.create_all)
+      await migrate(conn)
 
   async def execute(self, query: str) -> Result:
-    async with self.Session() as session:
-      result: Result = await session.execute(query)
-      await session.commit()
-      return result
+    is_read: bool = isinstance(query, Select)
+    session_factory: sessionmaker = self.ReadSession if is_read else self.Session
+    with self.call_site(), DB_OPERATION_SECONDS.time(operation='read' if is_read else 'write'):
+      async with session_factory() as session:
+        result: Result = await session.execute(query)
+        await session.commit()
+        return result
+
+  @asynccontextmanager
+  async def unit_of_work(self) -> AsyncIterator[UnitOfWork]:
+    uow = UnitOfWork(self)
+    try:
+      yield uow
+    except BaseException:
+      await uow.rollback()
+      raise
+    await uow.commit()
+
+  async def upsert_many(self, model: Any, rows: list[dict], index_elements: list[str]) -> list[Optional[Exception]]:
+    if not rows:
+      return []
+    statement = sqlite_insert(model.__table__)
+    statement = statement.on_conflict_do_update(
+      index_elements=index_elements,
+      set_={column: statement.excluded[column] for column in rows[0] if column not in index_elements}
+    )
+    with self.call_site(), DB_OPERATION_SECONDS.time(operation='upsert'):
+      try:
+        async with self.engine.begin() as conn:
+          await conn.execute(statement, rows)
+        errors: list[Optional[Exception]] = [None] * len(rows)
+      except IntegrityError as e:
+        errors = [e] if len(rows) == 1 else await self._upsert_rows(statement, rows)
+    DB_UPSERTED_ROWS.inc(errors.count(None), table=model.__tablename__)
+    return errors
+
+  async def _upsert_rows(self, statement: Any, rows: list[dict]) -> list[Optional[Exception]]:
+    log.warning(f"Batched upsert of {len(rows)} row(s) hit a constraint, retrying them one by one")
+    errors: list[Optional[Exception]] = []
+    for row in rows:
+      try:
+        async with self.engine.begin() as conn:
+          await conn.execute(statement, row)
+      except IntegrityError as e:
+        errors.append(e)
+        continue
+      errors.append(None)
+    return errors
 
   async def insert(self, entity: Any) -> Any:
-    async with self.Session() as session:
-      session.add(entity)
-      await session.commit()
-      await session.refresh(entity)
-      return entity
+    with self.call_site():
+      async with self.Session() as session:
+        session.add(entity)
+        await session.commit()
+        await session.refresh(entity)
+        return entity
 
   async def delete(self, entities: Union[Any, list[Any]]) -> None:
-    async with self.Session() as session:
-      if isinstance(entities, list):
-        for entity in entities:
-          await session.delete(entity)
-      else:
-        await session.delete(entities)
-      await session.commit()
+    with self.call_site():
+      async with self.Session() as session:
+        if isinstance(entities, list):
+          for entity in entities:
+            await session.delete(entity)
+        else:
+          await session.delete(entities)
+        await session.commit()
+
+  @contextmanager
+  def call_site(self) -> Iterator[None]:
+    if not self.profiler or CALL_SITE.get():
+      yield
+      return
+    token = CALL_SITE.set(_caller())
+    try:
+      yield
+    finally:
+      CALL_SITE.reset(token)
 
   async def close(self) -> None:
+    if self.profiler and self.profiler.stats:
+      self.profiler.dump(os.path.join(config.data_path, 'query_stats.json'))
+    if self.read_engine is not self.engine:
+      await self.read_engine.dispose()
     await self.engine.dispose()
 
   def _create_engine(self) -> AsyncEngine:
-    return create_async_engine(self.db_path, echo=False)
+    if not self.pragmas:
+      return create_async_engine(self.db_path, echo=False)
+    engine = create_async_engine(self.db_path, echo=False, **self._pool_options(pool_size=1))
+    self._set_pragmas(engine, query_only=False)
+    return engine
+
+  def _create_read_engine(self) -> AsyncEngine:
+    if not self.pragmas or self._is_memory():
+      return self.engine
+    engine = create_async_engine(self.db_path, echo=False, **self._pool_options(pool_size=self.read_pool_size))
+    self._set_pragmas(engine, query_only=True)
+    return engine
+
+  def _create_session(self, engine: AsyncEngine) -> sessionmaker:
+    return sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+  def _pool_options(self, pool_size: int) -> dict:
+    if self._is_memory():
+      return {}
+    return {'poolclass': AsyncAdaptedQueuePool, 'pool_size': pool_size, 'max_overflow': 0, 'pool_timeout': 30}
+
+  def _set_pragmas(self, engine: AsyncEngine, query_only: bool) -> None:
+    pragmas: dict = dict(self.pragmas, query_only='ON' if query_only else 'OFF')
+
+    @event.listens_for(engine.sync_engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, _) -> None:
+      cursor = dbapi_connection.cursor()
+      for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+      cursor.close()
 
-  def _create_session(self) -> sessionmaker:
-    return sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+  def _is_memory(self) -> bool:
+    return ':memory:' in self.db_path or self.db_path.rstrip('/').endswith('sqlite+aiosqlite:')
 
-database = Database(db_path=config.db_path)
+database = Database(
+  db_path=config.db_path,
+  profile=config.db_profile,
+  read_pool_size=config.db_read_pool_size,
+  profiler=QueryProfiler(slow_query_ms=config.db_slow_query_ms) if config.db_profiling else None
+)
@@ -1,38 +1,100 @@
+import asyncio
+import hashlib
+import json
 import os
+import time
 import discord
+from collections import defaultdict
 from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
 from discord.ext import commands
 from config import config
 from utils.database import Database, database
+from utils.executor import FormattingExecutor, formatting_executor
+from utils.identity import IdentityCache, identity_cache
+from utils.imaging import ImageProber, image_prober
 from utils.logging import logger
+from utils.metrics import MetricsServer, metrics_server
+from utils.steamer import Steam, steam
 
 log = logger.get_logger(__name__)
 
-class DiscordBot(commands.Bot):
+COGS_PATH = Path(__file__).resolve().parent.parent / 'bot' / 'cogs'
+STARTED_AT = time.perf_counter()
+
+BotBase = commands.AutoShardedBot if config.sharding else commands.Bot
+
+class DiscordBot(BotBase):
   database: Database = database
+  steam: Steam = steam
+  image_prober: ImageProber = image_prober
+  formatting_executor: FormattingExecutor = formatting_executor
+  identity_cache: IdentityCache = identity_cache
+  metrics_server: MetricsServer = metrics_server
   uptime: datetime = datetime.now()
 
   def __init__(self, **kwargs) -> None:
     kwargs.setdefault("activity", discord.Activity(type=discord.ActivityType.listening, name="NOKX"))
     kwargs.setdefault("allowed_mentions", discord.AllowedMentions(everyone=False))
     kwargs.setdefault("case_insensitive", True)
-    kwargs.setdefault("intents", discord.Intents.all())
-    kwargs.setdefault("max_messages", 2500)
+    for option, value in self._gateway_options(config.gateway_profile).items():
+      kwargs.setdefault(option, value)
     kwargs.setdefault("status", discord.Status.online)
+    if config.sharding and config.shard_count:
+      kwargs.setdefault("shard_count", config.shard_count)
+    if config.sharding and config.shard_ids:
+      kwargs.setdefault("shard_ids", config.shard_ids)
     super().__init__(command_prefix='/', **kwargs)
     self.owner_id = config.discord_owner_id
+    self.startup_timings: dict[str, float] = {}
 
   async def on_ready(self) -> None:
-    log.info(f"{self.user} is online | Server(s) : {len(self.guilds)}")
+    log.info(f"{self.user} is online | Server(s) : {len(self.guilds)} | Ready in {time.perf_counter() - STARTED_AT:.2f}s")
+    await self.identity_cache.warm(guild.id for guild in self.guilds)
+
+  @staticmethod
+  def _gateway_options(profile: str) -> dict:
+    if profile == 'lean':
+      return {
+        "intents": discord.Intents(guilds=True),
+        "max_messages": None,
+        "chunk_guilds_at_startup": False,
+        "member_cache_flags": discord.MemberCacheFlags.none()
+      }
+    return {"intents": discord.Intents.all(), "max_messages": 2500}
+
+  def owns_guild(self, guild_id: int) -> bool:
+    return self.get_guild(guild_id) is not None
+
+  async def on_guild_join(self, guild: discord.Guild) -> None:
+    self.identity_cache.invalidate_server(guild.id)
+
+  async def on_guild_remove(self, guild: discord.Guild) -> None:
+    self.identity_cache.invalidate_server(guild.id)
 
   async def setup_hook(self) -> None:
-    await self._init_database()
-    await self._load_extensions()
-    await self._sync_commands()
-    log.info("Initial BOT setup completed.")
+    phases: list[tuple[str, Callable[[], Awaitable[None]]]] = [
+      ('database', self._init_database),
+      ('http', self._init_http_clients),
+      ('executor', self._init_executor),
+      ('metrics', self._init_metrics),
+      ('extensions', self._load_extensions),
+      ('commands', self._sync_commands)
+    ]
+    for phase, step in phases:
+      started = time.perf_counter()
+      await step()
+      self.startup_timings[phase] = time.perf_counter() - started
+    breakdown = ', '.join(f"{phase} {duration * 1000:.0f}ms" for phase, duration in self.startup_timings.items())
+    log.info(f"Initial BOT setup completed in {sum(self.startup_timings.values()):.2f}s ({breakdown})")
 
   async def close(self) -> None:
     log.info("Closing BOT...")
+    await self.metrics_server.close()
+    await self.steam.close()
+    await self.image_prober.close()
+    self.formatting_executor.close()
     await self.database.close()
     await super().close()
 
@@ -40,27 +102,71 @@ class DiscordBot(commands.Bot):
     await self.database.setup()
     log.info("Database connection established")
 
+  async def _init_http_clients(self) -> None:
+    await self.steam.start()
+    self.steam.start_catalog_refresh()
+    await self.image_prober.start()
+    log.info("HTTP sessions opened")
+
+  async def _init_executor(self) -> None:
+    self.formatting_executor.start()
+
+  async def _init_metrics(self) -> None:
+    await self.metrics_server.start()
+
   async def _load_extensions(self) -> None:
-    for cog_folder in os.listdir('./bot/cogs'):
-      cog_path = os.path.join('./bot/cogs', cog_folder)
-      if os.path.isdir(cog_path):
-        cog_files_loaded = []
-        for root, _, files in os.walk(cog_path):
-          for filename in files:
-            if filename.endswith('.py') and filename != '__init__.py':
-              extension = f"bot.cogs.{os.path.relpath(root, './bot/cogs').replace(os.sep, '.')}.{filename[:-3]}"
-              try:
-                await self.load_extension(extension)
-                cog_files_loaded.append(extension)
-              except Exception as e:
-                log.error(f"Failed to load {extension}: {e}")
-        if cog_files_loaded:
-          log.info(f"{cog_folder.capitalize()} cog loaded with {len(cog_files_loaded)} file(s)")
+    extensions = sorted(
+      '.'.join(path.relative_to(COGS_PATH.parent.parent).with_suffix('').parts)
+      for path in COGS_PATH.rglob('*.py')
+      if path.name != '__init__.py'
+    )
+    results = await asyncio.gather(*(self.load_extension(extension) for extension in extensions), return_exceptions=True)
+    cog_files_loaded = defaultdict(int)
+    for extension, result in zip(extensions, results):
+      if isinstance(result, Exception):
+        log.error(f"Failed to load {extension}: {result}")
+      else:
+        cog_files_loaded[extension.split('.')[2]] += 1
+    for cog_folder, count in cog_files_loaded.items():
+      log.info(f"{cog_folder.capitalize()} cog loaded with {count} file(s)")
 
   async def _sync_commands(self) -> None:
+    fingerprint = self._command_tree_fingerprint()
+    fingerprint_path = os.path.join(config.data_path, 'command_tree.sha256')
+    if config.sync_commands != 'always' and self._read_fingerprint(fingerprint_path) == fingerprint:
+      log.info(f"{len(self.tree.get_commands())} command(s) unchanged, sync skipped")
+      return
     synced = await self.tree.sync()
+    self._write_fingerprint(fingerprint_path, fingerprint)
     log.info(f"{len(synced)} command(s) synced : {', '.join(command.name for command in synced)}")
 
+  def _command_tree_fingerprint(self) -> str:
+    commands_payload = sorted(
+      (command.to_dict(self.tree) for command in self.tree.get_commands()),
+      key=lambda command: (command.get('type', 1), command['name'])
+    )
+    payload = json.dumps({'application_id': self.application_id, 'commands': commands_payload}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+  @staticmethod
+  def _read_fingerprint(path: str) -> Optional[str]:
+    try:
+      with open(path, encoding='utf-8') as file:
+        return file.read().strip()
+    except OSError:
+      return None
+
+  @staticmethod
+  def _write_fingerprint(path: str, fingerprint: str) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+      os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+      with open(tmp_path, 'w', encoding='utf-8') as file:
+        file.write(fingerprint)
+      os.replace(tmp_path, path)
+    except OSError as e:
+      log.warning(f"Unable to save command tree fingerprint {path}: {e}")
+
 class NewsEmbed:
   def __init__(self, news: dict, game: dict, color=discord.Color.blue()) -> None:
     self.news = news
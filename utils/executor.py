@@ -0,0 +1,61 @@
+import asyncio
+import os
+import pickle
+from typing import TYPE_CHECKING, Any, Callable, Optional
+from config import config
+from utils.logging import logger
+
+if TYPE_CHECKING:
+  from concurrent.futures import ProcessPoolExecutor
+
+log = logger.get_logger(__name__)
+
+INLINE = 'inline'
+PROCESS = 'process'
+
+def _apply_batch(func: Callable[[Any], Any], items: list[Any]) -> list[Any]:
+  return [func(item) for item in items]
+
+class FormattingExecutor:
+  def __init__(self, mode: str = INLINE, workers: int = 0) -> None:
+    self.mode: str = mode if mode in (INLINE, PROCESS) else INLINE
+    self.workers: int = workers or os.cpu_count() or 1
+    self.pool: Optional['ProcessPoolExecutor'] = None
+
+  def start(self) -> None:
+    if self.mode != PROCESS or self.pool:
+      return
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+    self.pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context('spawn'))
+    log.info(f"Formatting process pool started with {self.workers} worker(s)")
+
+  def close(self) -> None:
+    if self.pool:
+      self.pool.shutdown(wait=False, cancel_futures=True)
+      self.pool = None
+
+  async def run(self, func: Callable[[Any], Any], item: Any) -> Any:
+    return (await self.map(func, [item]))[0]
+
+  async def map(self, func: Callable[[Any], Any], items: list[Any]) -> list[Any]:
+    if not items:
+      return []
+    if self.mode != PROCESS:
+      return _apply_batch(func, items)
+    self.start()
+    from concurrent.futures.process import BrokenProcessPool
+
+    loop = asyncio.get_running_loop()
+    chunk_size = -(-len(items) // min(self.workers, len(items)))
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    try:
+      results = await asyncio.gather(*(loop.run_in_executor(self.pool, _apply_batch, func, chunk) for chunk in chunks))
+    except (BrokenProcessPool, pickle.PicklingError, OSError) as e:
+      log.warning(f"Formatting process pool unavailable, falling back to inline execution: {e}")
+      self.close()
+      self.mode = INLINE
+      return _apply_batch(func, items)
+    return [result for chunk in results for result in chunk]
+
+formatting_executor = FormattingExecutor(mode=config.format_executor, workers=config.format_workers)
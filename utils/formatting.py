@@ -1,14 +1,17 @@
 from datetime import datetime
-from PIL import Image
-from io import BytesIO
+from typing import Optional
 import re
 import string
 
-import requests
+from utils.bbcode import BBCodeEngine
+from utils.imaging import image_prober
 from utils.logging import logger
+from utils.metrics import metrics
 
 log = logger.get_logger(__name__)
 
+CLEAN_CONTENT_SECONDS = metrics.histogram('formatter_clean_content_seconds', 'Time spent converting one announcement from BBCode')
+
 class SteamFormatter:
   REPLACEMENTS = {
     r'\[/?(b|u|i|strike)\]': '',  # Supprime toutes les balises [b], [u], [i], [strike] (et leurs fermetures)
@@ -42,20 +45,14 @@ class SteamFormatter:
     r'’': "'",  # Normalize les apostrophes
   }
 
+  ENGINE = BBCodeEngine(REPLACEMENTS)
+
   @staticmethod
   def clean_content(content: str, max_length: int = 500) -> str:
-    log.debug(f"Input : \"{content}\"")
-    format_list_block = SteamFormatter._format_list_block(content)
-    print(f"format_list_block : \"{format_list_block}\"")
-    apply_replacements = SteamFormatter._apply_replacements(format_list_block)
-    print(f"apply_replacements : \"{apply_replacements}\"")
-    no_duplicate_urls = SteamFormatter._remove_duplicate_urls(apply_replacements)
-    print(f"no_duplicate_urls : \"{no_duplicate_urls}\"")
-    limited = SteamFormatter._limit(no_duplicate_urls, max_chars=max_length, max_lines=12)
-    print(f"limited : \"{limited}\"")
-    cleaned_content = SteamFormatter._final_filter(limited)
-    print(f"cleaned_content : \"{cleaned_content}\"")
-    log.debug(f"Output : \"{cleaned_content}\"")
+    log.debug('Input : "%s"', content)
+    with CLEAN_CONTENT_SECONDS.time():
+      cleaned_content = SteamFormatter.ENGINE.render(content, max_length=max_length, max_lines=12)
+    log.debug('Output : "%s"', cleaned_content)
     return cleaned_content
   
   @staticmethod
@@ -63,125 +60,12 @@ class SteamFormatter:
     return datetime.fromtimestamp(timestamp)
   
   @staticmethod
-  def extract_image(content: str, min_width: int = 460, min_height: int = 215) -> str:
+  async def extract_image(content: str, min_width: int = 460, min_height: int = 215) -> Optional[str]:
     content_without_url = re.sub(r'\[url=.*?\].*?\[/url\]', '', content, flags=re.DOTALL)
     custom_image_urls = re.findall(r'\[img\](.+?)\[/img\]', content_without_url)
-    for url in custom_image_urls:
-      if url.lower().endswith('.gif'):
-        continue
-      url = url.replace('{STEAM_CLAN_IMAGE}', 'https://clan.akamai.steamstatic.com/images')
-      try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        img = Image.open(BytesIO(response.content))
-        if img.width >= min_width and img.height >= min_height:
-          return url
-      except Exception:
-        continue
-    return None
-
-  @staticmethod
-  def _apply_replacements(text: str) -> str:
-    for pattern, repl in SteamFormatter.REPLACEMENTS.items():
-      text = re.sub(pattern, repl, text, flags=re.MULTILINE)
-    return text.strip()
-
-  @staticmethod
-  def _limit(text: str, max_chars: int, max_lines: int) -> str:
-    lines = text.splitlines()
-    out, total = [], 0
-    for idx, line in enumerate(lines):
-      if idx >= max_lines or total >= max_chars:
-        break
-      remaining = max_chars - total
-      if len(line) + 1 <= remaining:
-        out.append(line)
-        total += len(line) + 1
-      else:
-        out.append(line[:remaining].rstrip() + '..')
-        total = max_chars
-        break
-    result = "\n".join(out).rstrip()
-    if len(out) < len(lines) or total < len(text):
-      result += "\n..."
-    return result
-  
-  @staticmethod
-  def _final_filter(content: str) -> str:
-    lines = content.splitlines()
-    filtered = []
-    i = 0
-    while i < len(lines):
-      raw = lines[i]
-      indent = raw[: len(raw) - len(raw.lstrip('\u00A0 '))]
-      stripped = raw.strip()
-      if stripped.startswith('**') and stripped.endswith('**') and stripped.count('**') == 2:
-        filtered.append(stripped)
-        i += 1
-        continue
-      if stripped.startswith('**') and stripped.endswith('**'):
-        next_stripped = lines[i + 1].strip() if i + 1 < len(lines) else '' 
-        if not next_stripped.startswith('•'): 
-          i += 1 
-          continue
-      if 'http' in stripped and stripped.endswith('..'):
-        parts = stripped.split()
-        if parts and parts[-1].startswith('http') and parts[-1].endswith('..'):
-          prefix = ' '.join(parts[:-1]).rstrip(' :;,')
-          stripped = prefix + '..'
-      filtered.append(indent + stripped)
-      i += 1
-    final_lines = []
-    for ln in filtered:
-      if ln == '...':
-        while final_lines and final_lines[-1] == '':
-          final_lines.pop()
-        final_lines.append(ln)
-      else:
-        final_lines.append(ln)
-    while final_lines and final_lines[-1] == '':
-      final_lines.pop()
-    return '\n'.join(final_lines)
-
-  @staticmethod
-  def _format_list_block(text: str) -> str:
-    text = re.sub(r'(?<!\n)\[list\]', '\n[list]', text)
-    text = re.sub(r'(?<!\n)\[/list\]', '\n[/list]', text)
-    text = re.sub(r'(?<!\n)\[\*\]\s*', '\n[*] ', text)
-    lines = text.splitlines()
-    formatted = []
-    depth = 0
-    for raw in lines:
-      stripped = raw.strip()
-      if not stripped:
-        formatted.append(raw)
-        continue
-      if stripped == "[list]":
-        depth += 1
-      elif stripped == "[/list]":
-        depth = max(depth - 1, 0)
-      elif stripped.startswith("[*]"):
-        content = stripped[3:].strip()
-        bullet = '\u00A0' * ((depth - 1) * 4) + ('•' if depth <= 1 else '◦')
-        formatted.append(f"{bullet} {content}")
-      else:
-        formatted.append(raw)
-        depth = 0
-    return "\n".join(formatted).strip()
-    
-  @staticmethod
-  def _remove_duplicate_urls(text: str) -> str:
-    urls_seen = set()
-    output = []
-    for line in text.splitlines():
-      urls_in_line = re.findall(r'https?://[^\s\]\)\}]+', line)
-      keep_line = line
-      for url in urls_in_line:
-        if url in urls_seen:
-          keep_line = keep_line.replace(url, '')
-        else:
-          urls_seen.add(url)
-      output.append(keep_line.rstrip())
-    cleaned_text = '\n'.join(output)
-    cleaned_text = re.sub(r'\n{3,}', '\n\n', cleaned_text)
-    return cleaned_text.strip()
+    candidates = [
+      url.replace('{STEAM_CLAN_IMAGE}', 'https://clan.akamai.steamstatic.com/images')
+      for url in custom_image_urls
+      if not url.lower().endswith('.gif')
+    ]
+    return await image_prober.first_matching(candidates, min_width, min_height)
@@ -0,0 +1,78 @@
+from typing import Any, Iterable, Optional
+from sqlalchemy.orm import joinedload
+from config import config
+from models import Game, Server, queries
+from utils.cache import TTLCache
+from utils.database import Database, UnitOfWork, database
+from utils.logging import logger
+from utils.metrics import metrics
+
+log = logger.get_logger(__name__)
+
+WARM_CHUNK_SIZE = 500
+
+IDENTITY_CACHE_LOOKUPS = metrics.counter('identity_cache_lookups_total', 'Identity cache lookups by cache and result')
+IDENTITY_CACHE_ENTRIES = metrics.gauge('identity_cache_entries', 'Entries held by the identity cache')
+
+class IdentityCache:
+  def __init__(self, db: Database, maxsize: int = 10000, ttl: float = 3600.0) -> None:
+    self.db: Database = db
+    self.servers: TTLCache = TTLCache(maxsize, ttl=ttl)
+    self.games: TTLCache = TTLCache(maxsize, ttl=ttl)
+
+  async def get_server(self, uow: UnitOfWork, guild_id: int, name: str) -> Server:
+    key = str(guild_id)
+    server: Optional[Server] = self.servers.get(key)
+    IDENTITY_CACHE_LOOKUPS.inc(cache='servers', result='miss' if server is None else 'hit')
+    if server is None:
+      server = await uow.get_or_create(Server, defaults={'name': name}, discord_id=key)
+      uow.after_commit(lambda: self._store(self.servers, key, server))
+    return server
+
+  async def get_game(self, uow: UnitOfWork, steam_id: str, defaults: Optional[dict] = None) -> Optional[Game]:
+    key = str(steam_id)
+    game: Optional[Game] = self.games.get(key)
+    IDENTITY_CACHE_LOOKUPS.inc(cache='games', result='miss' if game is None else 'hit')
+    if game is not None:
+      return game
+    if defaults is None:
+      game = (await uow.execute(queries.game_by_steam_id(key))).scalar_one_or_none()
+    else:
+      game = await uow.get_or_create(Game, defaults=defaults, options=(joinedload(Game.news),), steam_id=key)
+    if game is not None:
+      uow.after_commit(lambda: self._store(self.games, key, game))
+    return game
+
+  def invalidate_server(self, guild_id: int) -> None:
+    self.servers.pop(str(guild_id))
+
+  def invalidate_game(self, steam_id: str) -> None:
+    self.games.pop(str(steam_id))
+
+  async def warm(self, guild_ids: Iterable[int]) -> None:
+    keys = [str(guild_id) for guild_id in guild_ids][:self.servers.maxsize]
+    for start in range(0, len(keys), WARM_CHUNK_SIZE):
+      chunk = keys[start:start + WARM_CHUNK_SIZE]
+      servers = (await self.db.execute(queries.servers_by_discord_ids(chunk))).scalars().all()
+      for server in servers:
+        self.servers.set(server.discord_id, server)
+      games = (await self.db.execute(
+        queries.games_followed_by_servers(server.id for server in servers)
+      )).unique().scalars().all()
+      for game in games:
+        self.games.set(game.steam_id, game)
+    self._observe_entries()
+    log.info(f"Identity cache warmed with {len(self.servers)} server(s) and {len(self.games)} game(s)")
+
+  def stats(self) -> dict[str, Any]:
+    return {'servers': self.servers.stats(), 'games': self.games.stats()}
+
+  def _store(self, cache: TTLCache, key: str, entity: Any) -> None:
+    cache.set(key, entity)
+    self._observe_entries()
+
+  def _observe_entries(self) -> None:
+    IDENTITY_CACHE_ENTRIES.set(len(self.servers), cache='servers')
+    IDENTITY_CACHE_ENTRIES.set(len(self.games), cache='games')
+
+identity_cache = IdentityCache(database, maxsize=config.identity_cache_size, ttl=config.identity_cache_ttl)
@@ -0,0 +1,189 @@
+import asyncio
+import json
+import os
+import struct
+from io import BytesIO
+from typing import Optional
+import aiohttp
+from config import config
+from utils.cache import LRUCache, TTLCache
+from utils.logging import logger
+
+log = logger.get_logger(__name__)
+
+Size = tuple[int, int]
+
+UNKNOWN_SIZE: Size = (0, 0)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def parse_image_size(data: bytes) -> Optional[Size]:
+  if data[:8] == b'\x89PNG\r\n\x1a\n':
+    return _parse_png(data)
+  if data[:2] == b'\xff\xd8':
+    return _parse_jpeg(data)
+  if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+    return _parse_webp(data)
+  if data[:6] in (b'GIF87a', b'GIF89a') and len(data) >= 10:
+    return struct.unpack('<HH', data[6:10])
+  return None
+
+def _parse_png(data: bytes) -> Optional[Size]:
+  if len(data) < 24 or data[12:16] != b'IHDR':
+    return None
+  return struct.unpack('>II', data[16:24])
+
+def _parse_jpeg(data: bytes) -> Optional[Size]:
+  i = 2
+  while i + 9 < len(data):
+    if data[i] != 0xFF:
+      return None
+    marker = data[i + 1]
+    if marker == 0xFF:
+      i += 1
+      continue
+    if marker in JPEG_SOF_MARKERS:
+      height, width = struct.unpack('>HH', data[i + 5:i + 9])
+      return width, height
+    if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+      i += 2
+      continue
+    i += 2 + struct.unpack('>H', data[i + 2:i + 4])[0]
+  return None
+
+def _parse_webp(data: bytes) -> Optional[Size]:
+  chunk = data[12:16]
+  if chunk == b'VP8 ' and len(data) >= 30 and data[23:26] == b'\x9d\x01\x2a':
+    width, height = struct.unpack('<HH', data[26:30])
+    return width & 0x3FFF, height & 0x3FFF
+  if chunk == b'VP8L' and len(data) >= 25 and data[20] == 0x2F:
+    bits = int.from_bytes(data[21:25], 'little')
+    return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+  if chunk == b'VP8X' and len(data) >= 30:
+    return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+  return None
+
+def _parse_with_pillow(data: bytes) -> Optional[Size]:
+  from PIL import Image
+  try:
+    with Image.open(BytesIO(data)) as img:
+      return img.size
+  except Exception:
+    return None
+
+class ImageProber:
+  def __init__(
+    self,
+    cache_path: Optional[str] = None,
+    cache_size: int = 10000,
+    max_bytes: int = 65536,
+    concurrency: int = 8,
+    timeout: int = 5,
+    failure_ttl: float = 600.0
+  ) -> None:
+    self.cache_path: Optional[str] = cache_path
+    self.max_bytes: int = max_bytes
+    self.concurrency: int = max(concurrency, 1)
+    self.timeout: int = timeout
+    self.cache: LRUCache = LRUCache(cache_size)
+    self.failures: TTLCache = TTLCache(cache_size, ttl=failure_ttl)
+    self.session: Optional[aiohttp.ClientSession] = None
+    self._unsaved: int = 0
+
+  async def start(self) -> None:
+    if self.session and not self.session.closed:
+      return
+    self._load_cache()
+    connector = aiohttp.TCPConnector(limit=self.concurrency * 4, ttl_dns_cache=300)
+    self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+  async def close(self) -> None:
+    self.save_cache()
+    if self.session:
+      await self.session.close()
+      self.session = None
+
+  async def first_matching(self, urls: list[str], min_width: int, min_height: int) -> Optional[str]:
+    if not urls:
+      return None
+    if not self.session or self.session.closed:
+      await self.start()
+    semaphore = asyncio.Semaphore(self.concurrency)
+    probes = [asyncio.create_task(self._probe_limited(url, semaphore)) for url in urls]
+    try:
+      for url, probe in zip(urls, probes):
+        size = await probe
+        if size and size[0] >= min_width and size[1] >= min_height:
+          return url
+      return None
+    finally:
+      for probe in probes:
+        probe.cancel()
+      if self._unsaved >= 50:
+        self.save_cache()
+
+  async def probe(self, url: str) -> Optional[Size]:
+    size: Optional[Size] = self.cache.get(url)
+    if size:
+      return size
+    if self.failures.get(url):
+      return None
+    size = await self._fetch_size(url)
+    if not size or size == UNKNOWN_SIZE:
+      self.failures.set(url, True)
+      return size
+    self.cache.set(url, size)
+    self._unsaved += 1
+    return size
+
+  async def _probe_limited(self, url: str, semaphore: asyncio.Semaphore) -> Optional[Size]:
+    async with semaphore:
+      return await self.probe(url)
+
+  async def _fetch_size(self, url: str) -> Optional[Size]:
+    try:
+      async with self.session.get(url, headers={'Range': f"bytes=0-{self.max_bytes - 1}"}) as response:
+        if response.status not in (200, 206):
+          return None
+        data = b''
+        while len(data) < self.max_bytes:
+          chunk = await response.content.read(self.max_bytes - len(data))
+          if not chunk:
+            break
+          data += chunk
+          size = parse_image_size(data)
+          if size:
+            return size
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+      return None
+    return _parse_with_pillow(data) or UNKNOWN_SIZE
+
+  def _load_cache(self) -> None:
+    if not self.cache_path or not os.path.exists(self.cache_path):
+      return
+    try:
+      with open(self.cache_path, encoding='utf-8') as file:
+        for url, size in json.load(file).items():
+          if tuple(size) != UNKNOWN_SIZE:
+            self.cache.set(url, tuple(size))
+    except (OSError, ValueError) as e:
+      log.warning(f"Unable to load image size cache {self.cache_path}: {e}")
+
+  def save_cache(self) -> None:
+    if not self.cache_path or not self._unsaved:
+      return
+    tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+    try:
+      os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+      with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump({url: list(size) for url, size in self.cache.items()}, file)
+      os.replace(tmp_path, self.cache_path)
+      self._unsaved = 0
+    except OSError as e:
+      log.warning(f"Unable to save image size cache {self.cache_path}: {e}")
+
+image_prober = ImageProber(
+  cache_path=os.path.join(config.data_path, 'image_sizes.json'),
+  cache_size=config.image_cache_size,
+  max_bytes=config.image_probe_bytes,
+  concurrency=config.image_probe_concurrency
+)
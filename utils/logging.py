@@ -1,4 +1,8 @@
+import atexit
 import logging
+import multiprocessing
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional
 from config import config
 
@@ -27,6 +31,10 @@ class ColoredFormatter(logging.Formatter):
     levelname_color = COLORS.get(record.levelname, COLORS['DEFAULT'])
     return log_message.replace(record.levelname, f"{levelname_color}{record.levelname}{RESET}")
 
+class DeferredQueueHandler(QueueHandler):
+  def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+    return record
+
 class Logger(logging.Logger):
   def __init__(
     self,
@@ -34,26 +42,49 @@ class Logger(logging.Logger):
     console_level: int = logging.INFO,
     log_format: Optional[str] = None,
     date_format: Optional[str] = None,
-    log_file: Optional[str] = None
+    log_file: Optional[str] = None,
+    max_bytes: int = 10485760,
+    backup_count: int = 5
   ) -> None:
     self.file_level: int = file_level
     self.console_level: int = console_level
     self.log_format: str = log_format or "[{asctime}] [{levelname}] {name} {message}"
     self.date_format: str = date_format or "%Y-%m-%d %H:%M:%S"
     self.log_file: Optional[str] = log_file
+    self.max_bytes: int = max_bytes
+    self.backup_count: int = backup_count
     self._basic_formatter: logging.Formatter = self._create_basic_formatter()
     self._colored_formatter: logging.Formatter = self._create_colored_formatter()
-    self._file_handler: logging.FileHandler = self._create_file_handler()
+    self._file_handler: Optional[logging.FileHandler] = self._create_file_handler()
     self._stream_handler: logging.StreamHandler = self._create_stream_handler()
+    self._queue: queue.SimpleQueue = queue.SimpleQueue()
+    self._queue_handler: QueueHandler = DeferredQueueHandler(self._queue)
+    self._listener: Optional[QueueListener] = None
 
   def get_logger(self, name: str) -> logging.Logger:
     logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
-    logger.addHandler(self._stream_handler)
-    if self._file_handler:
-        logger.addHandler(self._file_handler)
+    logger.setLevel(self._logger_level())
+    if self._queue_handler not in logger.handlers:
+      logger.addHandler(self._queue_handler)
+    self.start()
     return logger
+
+  def start(self) -> None:
+    if self._listener:
+      return
+    handlers = [handler for handler in (self._stream_handler, self._file_handler) if handler]
+    self._listener = QueueListener(self._queue, *handlers, respect_handler_level=True)
+    self._listener.start()
+    atexit.register(self.stop)
+
+  def stop(self) -> None:
+    listener, self._listener = self._listener, None
+    if listener:
+      listener.stop()
   
+  def _logger_level(self) -> int:
+    return min(self.console_level, self.file_level) if self._file_handler else self.console_level
+
   def _create_basic_formatter(self) -> logging.Formatter:
     return logging.Formatter(fmt=self.log_format, datefmt=self.date_format, style="{")
       
@@ -69,9 +100,17 @@ class Logger(logging.Logger):
   def _create_file_handler(self) -> Optional[logging.FileHandler]:
     if not self.log_file:
       return None
-    self._file_handler = logging.FileHandler(self.log_file, encoding="utf-8", mode="w")
+    if multiprocessing.parent_process():
+      self._file_handler = logging.FileHandler(self.log_file, encoding="utf-8", mode="a")
+    else:
+      self._file_handler = RotatingFileHandler(
+        self.log_file,
+        encoding="utf-8",
+        maxBytes=self.max_bytes,
+        backupCount=self.backup_count
+      )
     self._file_handler.setLevel(self.file_level)
     self._file_handler.setFormatter(self._basic_formatter)
     return self._file_handler
 
-logger = Logger(log_file=config.log_file)
+logger = Logger(log_file=config.log_file, max_bytes=config.log_max_bytes, backup_count=config.log_backup_count)
@@ -1,5 +1,11 @@
 import difflib
+import heapq
 import re
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Iterable, Optional, Sequence
 
 class Matcher:
   @staticmethod
@@ -30,3 +36,128 @@ class Matcher:
           matched_items[item_value] = (similarity, item)
     sorted_items: list[tuple[float, dict[str, str]]] = sorted(matched_items.values(), key=lambda x: x[0], reverse=True)
     return [item[1] for item in sorted_items]
+
+class SearchIndex:
+  SHORT_NAME_LENGTH = 8
+  MAX_FUZZY_POSTINGS = 20000
+  FUZZY_CANDIDATES = 256
+
+  def __init__(
+    self,
+    names: Sequence[str],
+    keys: Sequence[int],
+    offsets: Sequence[int],
+    postings: Sequence[int],
+    short_ids: Sequence[int]
+  ) -> None:
+    self.names: Sequence[str] = names
+    self.keys: Sequence[int] = keys
+    self.offsets: Sequence[int] = offsets
+    self.postings: Sequence[int] = postings
+    self.short_ids: Sequence[int] = short_ids
+
+  @classmethod
+  def build(cls, names: Iterable[str]) -> 'SearchIndex':
+    normalized_names: list[str] = [Matcher.normalize_text(name) for name in names]
+    buckets: dict[int, list[int]] = {}
+    short_ids: array = array('I')
+    for position, name in enumerate(normalized_names):
+      if len(name) <= cls.SHORT_NAME_LENGTH:
+        short_ids.append(position)
+      for key in SearchIndex.trigram_keys(name):
+        buckets.setdefault(key, []).append(position)
+
+    keys: array = array('I', sorted(buckets))
+    offsets: array = array('I', [0])
+    postings: array = array('I')
+    for key in keys:
+      postings.extend(buckets[key])
+      offsets.append(len(postings))
+    return cls(normalized_names, keys, offsets, postings, short_ids)
+
+  @staticmethod
+  def trigram_keys(text: str) -> set[int]:
+    return {zlib.crc32(text[i:i + 3].encode('utf-8')) for i in range(len(text) - 2)}
+
+  def search(self, query: str, limit: Optional[int] = None, threshold: float = 0.4) -> list[tuple[int, float]]:
+    normalized_query: str = Matcher.normalize_text(query)
+    if not normalized_query:
+      return []
+    matches: list[tuple[int, float]] = self._substring_matches(normalized_query, threshold)
+    if not matches and len(normalized_query) >= 3:
+      matches = self._fuzzy_matches(normalized_query, threshold)
+    if limit is not None:
+      return heapq.nsmallest(limit, matches, key=lambda match: (-match[1], match[0]))
+    return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+  def _substring_matches(self, query: str, threshold: float) -> list[tuple[int, float]]:
+    matches: list[tuple[int, float]] = []
+    for position in self._substring_candidates(query, threshold):
+      name: str = self.names[position]
+      if query in name:
+        similarity: float = 2 * len(query) / (len(query) + len(name))
+        if similarity >= threshold:
+          matches.append((position, similarity))
+    return matches
+
+  def _substring_candidates(self, query: str, threshold: float) -> Sequence[int]:
+    if len(query) < 3:
+      max_length: float = len(query) * (2 - threshold) / threshold if threshold > 0 else float('inf')
+      return self.short_ids if max_length <= self.SHORT_NAME_LENGTH else range(len(self.names))
+    rarest: Optional[tuple[int, int]] = None
+    for key in SearchIndex.trigram_keys(query):
+      bounds: Optional[tuple[int, int]] = self._posting_bounds(key)
+      if not bounds:
+        return ()
+      if not rarest or bounds[1] - bounds[0] < rarest[1] - rarest[0]:
+        rarest = bounds
+    return self.postings[rarest[0]:rarest[1]]
+
+  def _fuzzy_matches(self, query: str, threshold: float) -> list[tuple[int, float]]:
+    query_keys: set[int] = SearchIndex.trigram_keys(query)
+    bounds: list[tuple[int, int]] = sorted(
+      filter(None, (self._posting_bounds(key) for key in query_keys)),
+      key=lambda bound: bound[1] - bound[0]
+    )
+    shared: Counter = Counter()
+    budget: int = self.MAX_FUZZY_POSTINGS
+    for start, end in bounds:
+      if shared and end - start > budget:
+        break
+      shared.update(self.postings[start:end])
+      budget -= end - start
+    matches: list[tuple[int, float]] = []
+    for position, _ in shared.most_common(self.FUZZY_CANDIDATES):
+      name_keys: set[int] = SearchIndex.trigram_keys(self.names[position])
+      similarity: float = 2 * len(query_keys & name_keys) / (len(query_keys) + len(name_keys))
+      if similarity >= threshold:
+        matches.append((position, similarity))
+    return matches
+
+  def _posting_bounds(self, key: int) -> Optional[tuple[int, int]]:
+    index: int = bisect_left(self.keys, key)
+    if index == len(self.keys) or self.keys[index] != key:
+      return None
+    return self.offsets[index], self.offsets[index + 1]
+
+class PrefixIndex:
+  def __init__(self, names: Sequence[str], order: Sequence[int]) -> None:
+    self.names: Sequence[str] = names
+    self.order: Sequence[int] = order
+
+  @classmethod
+  def build(cls, names: Sequence[str]) -> 'PrefixIndex':
+    return cls(names, array('I', sorted(range(len(names)), key=names.__getitem__)))
+
+  def search(self, prefix: str, limit: int = 25) -> list[int]:
+    normalized_prefix: str = Matcher.normalize_text(prefix)
+    if not normalized_prefix:
+      return []
+    start: int = bisect_left(self.order, normalized_prefix, key=self.names.__getitem__)
+    positions: list[int] = []
+    for index in range(start, min(start + limit, len(self.order))):
+      position: int = self.order[index]
+      if not self.names[position].startswith(normalized_prefix):
+        break
+      positions.append(position)
+    return positions
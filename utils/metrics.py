@@ -0,0 +1,209 @@
+import bisect
+import math
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from aiohttp import web
+from config import config
+from utils.logging import logger
+
+log = logger.get_logger(__name__)
+
+Labels = tuple[tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _labels(labels: dict) -> Labels:
+  return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(labels: Labels) -> str:
+  if not labels:
+    return ''
+  escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+  return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+def _format_value(value: float) -> str:
+  if math.isinf(value):
+    return '+Inf' if value > 0 else '-Inf'
+  return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Metric:
+  kind: str = 'untyped'
+
+  def __init__(self, name: str, description: str) -> None:
+    self.name: str = name
+    self.description: str = description
+
+  def samples(self) -> list[tuple[str, Labels, float]]:
+    return []
+
+  def render(self) -> list[str]:
+    lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+    lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in self.samples())
+    return lines
+
+class Counter(Metric):
+  kind = 'counter'
+
+  def __init__(self, name: str, description: str) -> None:
+    super().__init__(name, description)
+    self.values: dict[Labels, float] = {}
+
+  def inc(self, amount: float = 1.0, **labels: str) -> None:
+    key = _labels(labels)
+    self.values[key] = self.values.get(key, 0.0) + amount
+
+  def value(self, **labels: str) -> float:
+    return self.values.get(_labels(labels), 0.0)
+
+  def total(self) -> float:
+    return sum(self.values.values())
+
+  def samples(self) -> list[tuple[str, Labels, float]]:
+    return [(self.name, labels, value) for labels, value in sorted(self.values.items())]
+
+class Gauge(Counter):
+  kind = 'gauge'
+
+  def set(self, value: float, **labels: str) -> None:
+    self.values[_labels(labels)] = value
+
+  def dec(self, amount: float = 1.0, **labels: str) -> None:
+    self.inc(-amount, **labels)
+
+class HistogramSeries:
+  def __init__(self, buckets: int) -> None:
+    self.counts: list[int] = [0] * buckets
+    self.sum: float = 0.0
+    self.count: int = 0
+
+class Histogram(Metric):
+  kind = 'histogram'
+
+  def __init__(self, name: str, description: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+    super().__init__(name, description)
+    self.buckets: tuple[float, ...] = tuple(sorted(buckets)) + (math.inf,)
+    self.series: dict[Labels, HistogramSeries] = {}
+
+  def observe(self, value: float, **labels: str) -> None:
+    key = _labels(labels)
+    series = self.series.get(key)
+    if series is None:
+      series = self.series[key] = HistogramSeries(len(self.buckets))
+    series.counts[bisect.bisect_left(self.buckets, value)] += 1
+    series.sum += value
+    series.count += 1
+
+  @contextmanager
+  def time(self, **labels: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.observe(time.perf_counter() - started, **labels)
+
+  def count(self, **labels: str) -> int:
+    if labels:
+      series = self.series.get(_labels(labels))
+      return series.count if series else 0
+    return sum(series.count for series in self.series.values())
+
+  def quantile(self, q: float, **labels: str) -> float:
+    counts = self._merged_counts(_labels(labels) if labels else None)
+    total = sum(counts)
+    if not total:
+      return 0.0
+    rank = q * total
+    seen = 0
+    for index, count in enumerate(counts):
+      if seen + count >= rank and count:
+        lower = self.buckets[index - 1] if index else 0.0
+        upper = self.buckets[index]
+        if math.isinf(upper):
+          return lower
+        return lower + (upper - lower) * (rank - seen) / count
+      seen += count
+    return self.buckets[-2]
+
+  def samples(self) -> list[tuple[str, Labels, float]]:
+    samples = []
+    for labels, series in sorted(self.series.items()):
+      cumulative = 0
+      for bound, count in zip(self.buckets, series.counts):
+        cumulative += count
+        samples.append((f"{self.name}_bucket", labels + (('le', _format_value(bound)),), cumulative))
+      samples.append((f"{self.name}_sum", labels, series.sum))
+      samples.append((f"{self.name}_count", labels, series.count))
+    return samples
+
+  def _merged_counts(self, labels: Optional[Labels]) -> list[int]:
+    if labels is not None:
+      series = self.series.get(labels)
+      return list(series.counts) if series else []
+    merged = [0] * len(self.buckets)
+    for series in self.series.values():
+      merged = [total + count for total, count in zip(merged, series.counts)]
+    return merged
+
+class MetricsRegistry:
+  def __init__(self) -> None:
+    self.metrics: dict[str, Metric] = {}
+
+  def counter(self, name: str, description: str) -> Counter:
+    return self._register(Counter, name, description)
+
+  def gauge(self, name: str, description: str) -> Gauge:
+    return self._register(Gauge, name, description)
+
+  def histogram(self, name: str, description: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return self._register(Histogram, name, description, buckets)
+
+  def get(self, name: str) -> Optional[Metric]:
+    return self.metrics.get(name)
+
+  def render(self) -> str:
+    lines: list[str] = []
+    for name in sorted(self.metrics):
+      lines.extend(self.metrics[name].render())
+    return '\n'.join(lines) + '\n'
+
+  def _register(self, kind: type, name: str, description: str, *args) -> Metric:
+    metric = self.metrics.get(name)
+    if metric is None:
+      metric = self.metrics[name] = kind(name, description, *args)
+    elif type(metric) is not kind:
+      raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+    return metric
+
+class MetricsServer:
+  def __init__(self, registry: MetricsRegistry, host: str = '127.0.0.1', port: int = 0) -> None:
+    self.registry: MetricsRegistry = registry
+    self.host: str = host
+    self.port: int = port
+    self._runner: Optional[web.AppRunner] = None
+
+  async def start(self) -> None:
+    if not self.port or self._runner:
+      return
+    app = web.Application()
+    app.router.add_get('/metrics', self._handle_metrics)
+    self._runner = web.AppRunner(app, access_log=None)
+    await self._runner.setup()
+    try:
+      await web.TCPSite(self._runner, self.host, self.port).start()
+    except OSError as e:
+      log.error(f"Unable to serve metrics on {self.host}:{self.port}: {e}")
+      await self.close()
+      return
+    log.info(f"Metrics served on http://{self.host}:{self.port}/metrics")
+
+  async def close(self) -> None:
+    if self._runner:
+      await self._runner.cleanup()
+      self._runner = None
+
+  async def _handle_metrics(self, _: web.Request) -> web.Response:
+    return web.Response(body=self.registry.render().encode(), headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+metrics = MetricsRegistry()
+metrics_server = MetricsServer(metrics, host=config.metrics_host, port=config.metrics_port)
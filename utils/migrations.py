@@ -0,0 +1,51 @@
+from typing import Awaitable, Callable, Union
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from utils.logging import logger
+
+log = logger.get_logger(__name__)
+
+Step = Union[str, Callable[[AsyncConnection], Awaitable[None]]]
+Migration = tuple[int, str, list[Step]]
+
+def add_column(table: str, column: str, definition: str) -> Callable[[AsyncConnection], Awaitable[None]]:
+  async def step(conn: AsyncConnection) -> None:
+    columns = {row[1] for row in await conn.execute(text(f"PRAGMA table_info({table})"))}
+    if column not in columns:
+      await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+  return step
+
+MIGRATIONS: list[Migration] = [
+  (1, 'unique news per game', [
+    'DELETE FROM news WHERE id NOT IN (SELECT MAX(id) FROM news GROUP BY game_id)',
+    'CREATE UNIQUE INDEX IF NOT EXISTS ix_news_game_id ON news (game_id)'
+  ]),
+  (2, 'followed games indexes', [
+    'DELETE FROM followed_games WHERE id NOT IN (SELECT MIN(id) FROM followed_games GROUP BY game_id, server_id)',
+    'CREATE UNIQUE INDEX IF NOT EXISTS ix_followed_games_game_server ON followed_games (game_id, server_id)',
+    'CREATE INDEX IF NOT EXISTS ix_followed_games_server_id ON followed_games (server_id)'
+  ]),
+  (3, 'followed games delivery marker', [
+    add_column('followed_games', 'last_news_steam_id', 'VARCHAR'),
+    'UPDATE followed_games SET last_news_steam_id = '
+    '(SELECT steam_id FROM news WHERE news.game_id = followed_games.game_id) WHERE last_news_steam_id IS NULL'
+  ])
+]
+
+async def get_schema_version(conn: AsyncConnection) -> int:
+  return (await conn.execute(text('PRAGMA user_version'))).scalar()
+
+async def migrate(conn: AsyncConnection, migrations: list[Migration] = MIGRATIONS) -> int:
+  version: int = await get_schema_version(conn)
+  for migration_version, description, statements in sorted(migrations):
+    if migration_version <= version:
+      continue
+    for step in statements:
+      if callable(step):
+        await step(conn)
+      else:
+        await conn.execute(text(step))
+    await conn.execute(text(f"PRAGMA user_version = {migration_version}"))
+    version = migration_version
+    log.info(f"Database migrated to version {version} ({description})")
+  return version
@@ -0,0 +1,133 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, Optional
+from utils.logging import logger
+
+log = logger.get_logger(__name__)
+
+_DONE = object()
+
+Handler = Callable[[Any], Awaitable[Optional[Any]]]
+ErrorHandler = Callable[[str, Any, Exception], None]
+
+class Stage:
+  def __init__(self, name: str, handler: Handler, workers: int = 1, batch_size: int = 1, batch_wait: float = 0.0) -> None:
+    self.name: str = name
+    self.handler: Handler = handler
+    self.workers: int = max(workers, 1)
+    self.batch_size: int = max(batch_size, 1)
+    self.batch_wait: float = max(batch_wait, 0.0)
+
+class Pipeline:
+  def __init__(self, queue_size: int = 100, on_error: Optional[ErrorHandler] = None) -> None:
+    self.queue_size: int = max(queue_size, 1)
+    self.on_error: Optional[ErrorHandler] = on_error
+    self.stages: list[Stage] = []
+
+  def add_stage(self, name: str, handler: Handler, workers: int = 1, batch_size: int = 1, batch_wait: float = 0.0) -> 'Pipeline':
+    self.stages.append(Stage(name, handler, workers, batch_size, batch_wait))
+    return self
+
+  async def run(self, items: Iterable[Any]) -> list[Any]:
+    if not self.stages:
+      return list(items)
+
+    queues: list[asyncio.Queue] = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+    results: list[Any] = []
+    tasks: list[asyncio.Task] = [asyncio.create_task(self._feed(items, queues[0], self.stages[0].workers))]
+    for index, stage in enumerate(self.stages):
+      next_queue = queues[index + 1] if index + 1 < len(self.stages) else None
+      next_workers = self.stages[index + 1].workers if next_queue else 0
+      tasks.append(asyncio.create_task(self._run_stage(stage, queues[index], next_queue, next_workers, results)))
+
+    try:
+      await asyncio.gather(*tasks)
+    finally:
+      for task in tasks:
+        task.cancel()
+    return results
+
+  async def _feed(self, items: Iterable[Any], queue: asyncio.Queue, workers: int) -> None:
+    for item in items:
+      await queue.put(item)
+    for _ in range(workers):
+      await queue.put(_DONE)
+
+  async def _run_stage(
+    self,
+    stage: Stage,
+    queue: asyncio.Queue,
+    next_queue: Optional[asyncio.Queue],
+    next_workers: int,
+    results: list[Any]
+  ) -> None:
+    await asyncio.gather(*(self._work(stage, queue, next_queue, results) for _ in range(stage.workers)))
+    for _ in range(next_workers):
+      await next_queue.put(_DONE)
+
+  async def _work(self, stage: Stage, queue: asyncio.Queue, next_queue: Optional[asyncio.Queue], results: list[Any]) -> None:
+    while True:
+      item = await queue.get()
+      if item is _DONE:
+        return
+      if stage.batch_size > 1:
+        batch, done = await self._collect_batch(stage, queue, item)
+        await self._process_batch(stage, batch, next_queue, results)
+        if done:
+          return
+        continue
+      try:
+        output = await stage.handler(item)
+      except Exception as e:
+        self._handle_error(stage.name, item, e)
+        continue
+      await self._emit(output, next_queue, results)
+
+  async def _collect_batch(self, stage: Stage, queue: asyncio.Queue, first: Any) -> tuple[list[Any], bool]:
+    batch = [first]
+    deadline = asyncio.get_running_loop().time() + stage.batch_wait
+    while len(batch) < stage.batch_size:
+      if not queue.empty():
+        item = queue.get_nowait()
+      else:
+        remaining = deadline - asyncio.get_running_loop().time()
+        if remaining <= 0:
+          break
+        try:
+          item = await asyncio.wait_for(queue.get(), remaining)
+        except asyncio.TimeoutError:
+          break
+      if item is _DONE:
+        return batch, True
+      batch.append(item)
+    return batch, False
+
+  async def _process_batch(self, stage: Stage, batch: list[Any], next_queue: Optional[asyncio.Queue], results: list[Any]) -> None:
+    try:
+      outputs = await stage.handler(batch)
+    except Exception as e:
+      if len(batch) == 1:
+        self._handle_error(stage.name, batch[0], e)
+        return
+      log.warning(f"Pipeline stage '{stage.name}' failed on a batch of {len(batch)} item(s), retrying them one by one: {e}")
+      for item in batch:
+        await self._process_batch(stage, [item], next_queue, results)
+      return
+    for item, output in zip(batch, outputs):
+      if isinstance(output, Exception):
+        self._handle_error(stage.name, item, output)
+      else:
+        await self._emit(output, next_queue, results)
+
+  async def _emit(self, output: Optional[Any], next_queue: Optional[asyncio.Queue], results: list[Any]) -> None:
+    if output is None:
+      return
+    if next_queue:
+      await next_queue.put(output)
+    else:
+      results.append(output)
+
+  def _handle_error(self, stage_name: str, item: Any, error: Exception) -> None:
+    if self.on_error:
+      self.on_error(stage_name, item, error)
+    else:
+      log.error(f"Pipeline stage '{stage_name}' failed: {error}")
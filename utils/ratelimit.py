@@ -0,0 +1,54 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+class SlidingWindow:
+  def __init__(self, limit: float, period: float = 1.0) -> None:
+    self.limit: int = max(int(limit), 1)
+    self.period: float = period
+    self.calls: deque = deque()
+    self.pending: int = 0
+    self._lock: asyncio.Lock = asyncio.Lock()
+    self._released: asyncio.Event = asyncio.Event()
+
+  @asynccontextmanager
+  async def slot(self) -> AsyncIterator[float]:
+    waited = await self.acquire()
+    try:
+      yield waited
+    finally:
+      self.release()
+
+  async def acquire(self) -> float:
+    started = time.monotonic()
+    async with self._lock:
+      while True:
+        now = self._expire()
+        if len(self.calls) + self.pending < self.limit:
+          self.pending += 1
+          return now - started
+        if self.calls:
+          await asyncio.sleep(self.calls[0] + self.period - now)
+        else:
+          self._released.clear()
+          await self._released.wait()
+
+  def try_acquire(self) -> float:
+    now = self._expire()
+    if len(self.calls) + self.pending < self.limit:
+      self.pending += 1
+      return 0.0
+    return self.calls[0] + self.period - now if self.calls else self.period
+
+  def release(self) -> None:
+    self.pending -= 1
+    self.calls.append(time.monotonic())
+    self._released.set()
+
+  def _expire(self) -> float:
+    now = time.monotonic()
+    while self.calls and self.calls[0] <= now - self.period:
+      self.calls.popleft()
+    return now
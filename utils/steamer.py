@@ -1,23 +1,135 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
 import aiohttp
-from typing import Optional
-from utils.matching import Matcher
+from typing import Any, Callable, Hashable, Optional
+from config import config
+from utils.cache import LRUCache
+from utils.catalog import AppCatalog
+from utils.logging import logger
+from utils.metrics import metrics
+
+log = logger.get_logger(__name__)
+
+STEAM_REQUEST_SECONDS = metrics.histogram('steam_request_seconds', 'Steam Web API request latency in seconds')
+STEAM_REQUESTS = metrics.counter('steam_requests_total', 'Steam Web API requests by endpoint and outcome')
+
+class CachedResponse:
+  def __init__(self, value: Any, body_hash: bytes, size: int, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+    self.value: Any = value
+    self.body_hash: bytes = body_hash
+    self.size: int = size
+    self.etag: Optional[str] = etag
+    self.last_modified: Optional[str] = last_modified
+
+  def validators(self) -> dict[str, str]:
+    headers: dict[str, str] = {}
+    if self.etag:
+      headers['If-None-Match'] = self.etag
+    if self.last_modified:
+      headers['If-Modified-Since'] = self.last_modified
+    return headers
+
+class ResponseCache(LRUCache):
+  def __init__(self, maxsize: int = 5000) -> None:
+    super().__init__(maxsize)
+    self.not_modified: int = 0
+    self.bytes_saved: int = 0
+
+  def lookup(self, key: Hashable) -> Optional[CachedResponse]:
+    entry: Optional[CachedResponse] = self._data.get(key)
+    if entry:
+      self._data.move_to_end(key)
+    return entry
+
+  def record_hit(self, entry: CachedResponse, not_modified: bool) -> None:
+    self.hits += 1
+    if not_modified:
+      self.not_modified += 1
+      self.bytes_saved += entry.size
+
+  def record_miss(self, key: Hashable, entry: CachedResponse) -> None:
+    self.misses += 1
+    self.set(key, entry)
+
+  def stats(self) -> dict:
+    stats = super().stats()
+    stats['not_modified'] = self.not_modified
+    stats['bytes_saved'] = self.bytes_saved
+    return stats
 
 class Steam:
-  def __init__(self) -> None:
+  def __init__(
+    self,
+    pool_limit: int = 100,
+    pool_limit_per_host: int = 20,
+    dns_cache_ttl: int = 300,
+    connect_timeout: int = 5,
+    timeout: int = 15,
+    cache_size: int = 5000,
+    catalog_path: Optional[str] = None,
+    catalog_ttl: int = 86400,
+    api_url: str = 'http://api.steampowered.com',
+    store_url: str = 'http://store.steampowered.com'
+  ) -> None:
+    self.pool_limit: int = pool_limit
+    self.pool_limit_per_host: int = pool_limit_per_host
+    self.dns_cache_ttl: int = dns_cache_ttl
+    self.connect_timeout: int = connect_timeout
+    self.timeout: int = timeout
+    self.session: Optional[aiohttp.ClientSession] = None
+    self.response_cache: ResponseCache = ResponseCache(cache_size)
     self.format: str = "json"
-    self.steam_news_url: str = "http://api.steampowered.com/ISteamNews/GetNewsForApp/v0002/"
-    self.steam_store_url: str = "http://store.steampowered.com/api/appdetails"
-    self.steam_app_list_url: str = "http://api.steampowered.com/ISteamApps/GetAppList/v2/"
-    self.steam_app_list_data: Optional[dict] = None
-
-  async def get_game_news(self, app_id: int) -> Optional[dict]:
-    data: Optional[dict] = await self._fetch_json(self.steam_news_url, params={'appid': app_id, 'format': self.format})
-    if data:
-      news_items: list[dict] = data.get('appnews', {}).get('newsitems', [])
-      for item in news_items:
-        if item.get('feedname') == 'steam_community_announcements':
-          return item
-    return None
+    self.steam_news_url: str = f"{api_url.rstrip('/')}/ISteamNews/GetNewsForApp/v0002/"
+    self.steam_store_url: str = f"{store_url.rstrip('/')}/api/appdetails"
+    self.steam_app_list_url: str = f"{api_url.rstrip('/')}/ISteamApps/GetAppList/v2/"
+    self.endpoints: dict[str, str] = {
+      self.steam_news_url: 'news',
+      self.steam_store_url: 'appdetails',
+      self.steam_app_list_url: 'applist'
+    }
+    self.catalog_path: Optional[str] = catalog_path
+    self.catalog_ttl: int = catalog_ttl
+    self.app_catalog: Optional[AppCatalog] = None
+    self._catalog_lock: asyncio.Lock = asyncio.Lock()
+    self._catalog_task: Optional[asyncio.Task] = None
+
+  async def start(self) -> None:
+    if self.session and not self.session.closed:
+      return
+    connector = aiohttp.TCPConnector(
+      limit=self.pool_limit,
+      limit_per_host=self.pool_limit_per_host,
+      use_dns_cache=True,
+      ttl_dns_cache=self.dns_cache_ttl
+    )
+    timeout = aiohttp.ClientTimeout(total=self.timeout, connect=self.connect_timeout)
+    self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+  def start_catalog_refresh(self) -> None:
+    if not self._catalog_task:
+      self._catalog_task = asyncio.create_task(self._refresh_catalog_loop())
+
+  async def close(self) -> None:
+    if self._catalog_task:
+      self._catalog_task.cancel()
+      self._catalog_task = None
+    if self.session:
+      await self.session.close()
+      self.session = None
+
+  async def get_game_news(self, app_id: int, only_changed: bool = False) -> Optional[dict]:
+    item, changed = await self._fetch_cached_json(
+      str(app_id),
+      self.steam_news_url,
+      params={'appid': app_id, 'format': self.format},
+      transform=self._extract_announcement
+    )
+    if only_changed and not changed:
+      return None
+    return item
 
   async def get_game_info(self, app_id: int) -> Optional[dict]:
     app_data: Optional[dict] = await self._get_app_data(app_id)
@@ -28,31 +140,141 @@ class Steam:
       }
     return None
 
-  async def get_steam_app_list(self) -> Optional[dict]:
-    if not self.steam_app_list_data:
-      self.steam_app_list_data = await self._fetch_json(self.steam_app_list_url)
-    return self.steam_app_list_data
+  async def get_app_catalog(self) -> Optional[AppCatalog]:
+    if self.app_catalog is None:
+      await self.refresh_app_catalog(force=False)
+    return self.app_catalog
 
-  async def search_game_by_name(self, game_name: str) -> list[dict]:
-    data: Optional[dict] = await self.get_steam_app_list()
-    if not data:
+  async def refresh_app_catalog(self, force: bool = True) -> bool:
+    async with self._catalog_lock:
+      if not force:
+        if self.app_catalog is None and self.catalog_path:
+          self.app_catalog = await asyncio.to_thread(AppCatalog.load, self.catalog_path)
+        if self.app_catalog is not None:
+          return True
+      data: Optional[dict] = await self._fetch_json(self.steam_app_list_url)
+      if not data:
+        return False
+      app_list: list[dict] = data.get('applist', {}).get('apps', [])
+      self.app_catalog = await asyncio.to_thread(self._build_catalog, app_list)
+      log.info(f"Steam app catalog refreshed with {len(self.app_catalog)} app(s)")
+      return True
+
+  async def search_game_by_name(self, game_name: str, limit: Optional[int] = None) -> list[dict]:
+    catalog: Optional[AppCatalog] = await self.get_app_catalog()
+    if not catalog:
       return []
-    app_list: list[dict] = data.get('applist', {}).get('apps', [])
-    return Matcher.search_and_sort_by_string(
-      search_string=game_name,
-      items=app_list,
-      key='name',
-      threshold=0.4
-    )
+    results: list[dict] = []
+    positions_by_name: dict[str, int] = {}
+    for position, _ in catalog.index.search(game_name, threshold=0.4):
+      app: dict = catalog.app(position)
+      name: str = app['name']
+      if name in positions_by_name:
+        results[positions_by_name[name]] = app
+        continue
+      if limit is not None and len(results) >= limit:
+        continue
+      positions_by_name[name] = len(results)
+      results.append(app)
+    return results
 
   async def _fetch_json(self, url: str, params: Optional[dict] = None) -> Optional[dict]:
+    if not self.session or self.session.closed:
+      await self.start()
+    endpoint: str = self.endpoints.get(url, 'other')
+    status: str = 'error'
     try:
-      async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params) as response:
+      with STEAM_REQUEST_SECONDS.time(endpoint=endpoint):
+        async with self.session.get(url, params=params) as response:
+          status = str(response.status)
           if response.status == 200:
             return await response.json()
-    except aiohttp.ClientError:
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+      status = 'error'
       return None
+    finally:
+      STEAM_REQUESTS.inc(endpoint=endpoint, status=status)
+    return None
+
+  async def _fetch_cached_json(
+    self,
+    key: Hashable,
+    url: str,
+    params: Optional[dict] = None,
+    transform: Callable[[dict], Any] = lambda data: data
+  ) -> tuple[Optional[Any], bool]:
+    if not self.session or self.session.closed:
+      await self.start()
+    cached: Optional[CachedResponse] = self.response_cache.lookup(key)
+    headers: dict[str, str] = cached.validators() if cached else {}
+    endpoint: str = self.endpoints.get(url, 'other')
+    status: str = 'error'
+    try:
+      with STEAM_REQUEST_SECONDS.time(endpoint=endpoint):
+        async with self.session.get(url, params=params, headers=headers) as response:
+          status = str(response.status)
+          if response.status == 304 and cached:
+            self.response_cache.record_hit(cached, not_modified=True)
+            return cached.value, False
+          if response.status != 200:
+            return None, True
+          body: bytes = await response.read()
+          etag: Optional[str] = response.headers.get('ETag')
+          last_modified: Optional[str] = response.headers.get('Last-Modified')
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+      status = 'error'
+      return None, True
+    finally:
+      STEAM_REQUESTS.inc(endpoint=endpoint, status=status)
+
+    body_hash: bytes = hashlib.blake2b(body, digest_size=16).digest()
+    if cached and cached.body_hash == body_hash:
+      cached.etag, cached.last_modified = etag, last_modified
+      self.response_cache.record_hit(cached, not_modified=False)
+      return cached.value, False
+
+    try:
+      value: Any = transform(json.loads(body))
+    except ValueError:
+      return None, True
+    self.response_cache.record_miss(key, CachedResponse(value, body_hash, len(body), etag, last_modified))
+    return value, True
+
+  def _build_catalog(self, app_list: list[dict]) -> AppCatalog:
+    catalog: AppCatalog = AppCatalog.build(app_list)
+    if not self.catalog_path:
+      return catalog
+    catalog.save(self.catalog_path)
+    return AppCatalog.load(self.catalog_path) or catalog
+
+  def _catalog_age(self) -> Optional[float]:
+    if not self.catalog_path or not os.path.exists(self.catalog_path):
+      return None
+    return time.time() - os.path.getmtime(self.catalog_path)
+
+  async def _refresh_catalog_loop(self) -> None:
+    while True:
+      try:
+        if self.catalog_path and self.app_catalog is None:
+          self.app_catalog = await asyncio.to_thread(AppCatalog.load, self.catalog_path)
+        age: Optional[float] = self._catalog_age()
+        if age is not None and self.app_catalog is None:
+          age = None
+        if age is not None and age < self.catalog_ttl:
+          await asyncio.sleep(self.catalog_ttl - age)
+          continue
+        refreshed: bool = await self.refresh_app_catalog()
+      except Exception as e:
+        log.error(f"Unable to refresh the Steam app catalog: {e}")
+        refreshed = False
+      await asyncio.sleep(self.catalog_ttl if refreshed else min(self.catalog_ttl, 600))
+
+  @staticmethod
+  def _extract_announcement(data: dict) -> Optional[dict]:
+    news_items: list[dict] = data.get('appnews', {}).get('newsitems', [])
+    for item in news_items:
+      if item.get('feedname') == 'steam_community_announcements':
+        return item
     return None
 
   async def _get_app_data(self, app_id: int) -> Optional[dict]:
@@ -61,4 +283,15 @@ class Steam:
       return data[str(app_id)]['data']
     return None
 
-steam = Steam()
+steam = Steam(
+  pool_limit=config.steam_pool_limit,
+  pool_limit_per_host=config.steam_pool_limit_per_host,
+  dns_cache_ttl=config.steam_dns_cache_ttl,
+  connect_timeout=config.steam_connect_timeout,
+  timeout=config.steam_timeout,
+  cache_size=config.steam_cache_size,
+  catalog_path=os.path.join(config.data_path, 'steam_apps.bin'),
+  catalog_ttl=config.steam_app_list_ttl,
+  api_url=config.steam_api_url,
+  store_url=config.steam_store_url
+)